@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Re-render visa PDFs for approved applications, e.g. after create_visa_pdf changes.
+
+Streams approved applications in _id order, first from visa_applications and then
+from visa_applications_archive, renders them in a process pool and upserts the
+PDFs into db.visa_documents. The last processed collection and _id are checkpointed
+after every batch, so an interrupted or --limit run resumes where it stopped; a
+run that reaches the end clears the checkpoint. Bulk renders use the template
+letter rather than calling the LLM once per application.
+
+    python backend/regenerate_visa_pdfs.py                        # start or resume
+    python backend/regenerate_visa_pdfs.py --restart              # ignore the checkpoint
+    python backend/regenerate_visa_pdfs.py --dry-run --limit 500  # benchmark rendering only
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
+from pymongo import ReplaceOne
+
+import server
+
+CHECKPOINT_ID = "regenerate_visa_pdfs"
+# Live applications first, then the archive (whose document blobs are compressed)
+COLLECTIONS = ("visa_applications", "visa_applications_archive")
+RENDER_PROJECTION = {
+    "application_id": 1,
+    "visa_type": 1,
+    "personal_info": 1,
+    "travel_details": 1,
+    "documents.photo": 1,
+}
+
+
+def render_visa_pdf(application: dict) -> bytes:
+    """Runs in a pool worker; the application already carries its photo data"""
+    return server.create_visa_pdf(server.default_visa_letter(application), application).getvalue()
+
+
+async def regenerate_visa_pdfs(batch_size: int = 100, workers: Optional[int] = None, dry_run: bool = False,
+                               restart: bool = False, limit: int = 0, report=print) -> dict:
+    db = server.db
+    checkpoint = None
+    if not (restart or dry_run):
+        checkpoint = await db.job_checkpoints.find_one({"_id": CHECKPOINT_ID})
+
+    start = 0
+    if checkpoint:
+        start = COLLECTIONS.index(checkpoint.get("collection", COLLECTIONS[0]))
+        report(f"Resuming after {checkpoint['last_id']} ({checkpoint.get('processed', 0)} already rendered)")
+    cursors = []
+    for collection in COLLECTIONS[start:]:
+        query = {"status": "approved"}
+        if checkpoint and not cursors:
+            query["_id"] = {"$gt": checkpoint["last_id"]}
+        cursors.append((collection, db[collection].find(query, RENDER_PROJECTION).sort("_id", 1).batch_size(batch_size)))
+    fetched = 0
+
+    async def fetch_batch() -> tuple:
+        """Next batch from the live collection, then the archive; empty once done or at the limit"""
+        nonlocal fetched
+        while cursors:
+            collection, cursor = cursors[0]
+            size = min(batch_size, limit - fetched) if limit else batch_size
+            if size <= 0:
+                break
+            batch = await cursor.to_list(size)
+            if batch:
+                fetched += len(batch)
+                if collection == "visa_applications_archive":
+                    batch = [server.restore_document_blobs(app) for app in batch]
+                return collection, await server.load_batch_document_data(batch, ["photo"])
+            cursors.pop(0)
+        return None, []
+
+    loop = asyncio.get_running_loop()
+    rendered = 0
+    total_bytes = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        next_batch = asyncio.create_task(fetch_batch())
+        while True:
+            collection, batch = await next_batch
+            if not batch:
+                break
+            # Read the next batch from Mongo while the pool renders this one
+            next_batch = asyncio.create_task(fetch_batch())
+            pdfs = await asyncio.gather(*(loop.run_in_executor(pool, render_visa_pdf, app) for app in batch))
+
+            if not dry_run:
+                rendered_at = datetime.now(timezone.utc).isoformat()
+                await db.visa_documents.bulk_write([
+                    ReplaceOne(
+                        {"application_id": app["application_id"]},
+                        {
+                            "application_id": app["application_id"],
+                            "pdf": pdf,
+                            "sha256": hashlib.sha256(pdf).hexdigest(),
+                            "size": len(pdf),
+                            "rendered_at": rendered_at
+                        },
+                        upsert=True
+                    )
+                    for app, pdf in zip(batch, pdfs)
+                ], ordered=False)
+                await db.job_checkpoints.update_one(
+                    {"_id": CHECKPOINT_ID},
+                    {"$set": {"collection": collection, "last_id": batch[-1]["_id"], "updated_at": rendered_at}, "$inc": {"processed": len(batch)}},
+                    upsert=True
+                )
+
+            rendered += len(batch)
+            total_bytes += sum(len(pdf) for pdf in pdfs)
+            elapsed = time.perf_counter() - started
+            report(f"{rendered} rendered, {rendered / elapsed:.1f} PDFs/s")
+
+    # Hitting --limit is a pause, not the end of the job; keep the checkpoint to resume from
+    if not dry_run and not cursors:
+        await db.job_checkpoints.delete_one({"_id": CHECKPOINT_ID})
+
+    elapsed = time.perf_counter() - started
+    return {
+        "rendered": rendered,
+        "dry_run": dry_run,
+        "seconds": round(elapsed, 2),
+        "pdfs_per_second": round(rendered / elapsed, 1) if elapsed else 0.0,
+        "average_kb": round(total_bytes / rendered / 1024, 1) if rendered else 0.0,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=100, help="applications read and rendered per batch")
+    parser.add_argument("--workers", type=int, default=None, help="render processes (default: one per core)")
+    parser.add_argument("--dry-run", action="store_true", help="render without storing PDFs or checkpoints")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and start from the beginning")
+    parser.add_argument("--limit", type=int, default=0, help="stop after this many applications")
+    args = parser.parse_args()
+
+    await server.connect_to_mongo()
+    try:
+        summary = await regenerate_visa_pdfs(args.batch_size, args.workers, args.dry_run, args.restart, args.limit)
+    finally:
+        server.client.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
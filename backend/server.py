@@ -1,42 +1,246 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Cookie, Response, Request
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Cookie, Response, Request, Depends
+from fastapi.responses import JSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.datastructures import Headers
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, CursorType, ReplaceOne
+from pymongo.errors import CollectionInvalid, DuplicateKeyError
+from pymongo import monitoring
 import os
 import logging
+from logging.handlers import QueueHandler, QueueListener
+import queue
+import random
+import re
+import atexit
+from contextvars import ContextVar
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+from collections import OrderedDict, deque
 import uuid
 from datetime import datetime, timezone, timedelta
-import bcrypt
 import base64
-import requests
+import hashlib
+import zlib
+import csv
+import json
+from io import StringIO
+from email.utils import format_datetime, parsedate_to_datetime
 import asyncio
-import resend
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
+import importlib
+import math
+import time
+import threading
+from html import escape
 from io import BytesIO
-from emergentintegrations.llm.chat import LlmChat, UserMessage
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+def parse_rate_limit(value: str) -> Optional[tuple]:
+    """Parse "burst/seconds" into (capacity, tokens per second); empty or "0" disables the limit"""
+    if not value or value == "0":
+        return None
+    burst, seconds = value.split("/")
+    return int(burst), int(burst) / float(seconds)
 
-resend.api_key = os.environ.get('RESEND_API_KEY')
+# Opened by the connect_to_mongo startup hook so importing this module never touches the network
+client: Optional[AsyncIOMotorClient] = None
+db = None
+# Swap before startup for any Motor-compatible client, e.g. the in-memory fake the tests use
+mongo_client_factory = AsyncIOMotorClient
+
+# Per-worker connection pool; size it so workers x MONGO_MAX_POOL_SIZE fits the server's connection limit
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+# Connections opened at startup and kept open, so the first requests do not pay for the handshake
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '5'))
+# How long a request waits for a free connection before failing; timeouts here mean pool exhaustion
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+# /api/health/ready reports not ready when a ping takes longer than this
+HEALTH_PING_TIMEOUT_SECONDS = float(os.environ.get('HEALTH_PING_TIMEOUT_SECONDS', '2'))
+
+RESEND_API_KEY = os.environ.get('RESEND_API_KEY')
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'onboarding@resend.dev')
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 
+# Rows fetched from Mongo per cursor batch when streaming exports
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+
+# Decided applications older than this move to visa_applications_archive
+ARCHIVE_ENABLED = os.environ.get('ARCHIVE_ENABLED', 'false').lower() == 'true'
+ARCHIVE_AFTER_DAYS = int(os.environ.get('ARCHIVE_AFTER_DAYS', '180'))
+ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', '100'))
+ARCHIVE_BATCH_PAUSE_SECONDS = float(os.environ.get('ARCHIVE_BATCH_PAUSE_SECONDS', '1'))
+ARCHIVE_INTERVAL_SECONDS = int(os.environ.get('ARCHIVE_INTERVAL_SECONDS', '3600'))
+
+# Uploads are hashed in chunks of this size before deciding whether to store them
+DOCUMENT_CHUNK_SIZE = 64 * 1024
+# How often blobs no application references any more are deleted; 0 disables
+BLOB_GC_INTERVAL_SECONDS = int(os.environ.get('BLOB_GC_INTERVAL_SECONDS', '3600'))
+
+# Page size limits for the applicant dashboard summary view
+SUMMARY_PAGE_SIZE = 50
+SUMMARY_MAX_PAGE_SIZE = 200
+
+# Admin recipient list is re-read at most this often (and on role changes)
+ADMIN_RECIPIENTS_TTL_SECONDS = int(os.environ.get('ADMIN_RECIPIENTS_TTL_SECONDS', '300'))
+# Decisions are batched into one admin email per interval; e.g. 86400 for a daily digest, 0 sends each immediately
+ADMIN_NOTIFICATION_FLUSH_SECONDS = int(os.environ.get('ADMIN_NOTIFICATION_FLUSH_SECONDS', '60'))
+# Oldest queued decisions are dropped beyond this, e.g. while the email provider is down
+ADMIN_NOTIFICATION_QUEUE_LIMIT = int(os.environ.get('ADMIN_NOTIFICATION_QUEUE_LIMIT', '1000'))
+
+# PDF, email, LLM and HTTP clients are imported on first use; this preloads them in a
+# background thread after startup so the first approval does not pay for the import
+WARM_UP_IMPORTS = os.environ.get('WARM_UP_IMPORTS', 'true').lower() == 'true'
+OPTIONAL_MODULES = (
+    "bcrypt",
+    "requests",
+    "resend",
+    "reportlab.platypus",
+    "emergentintegrations.llm.chat",
+)
+
+# Token buckets for expensive routes as "burst/seconds": up to burst requests, refilled
+# evenly over that many seconds, per client IP (login, register) or user (upload, status)
+RATE_LIMITS = {
+    route: parse_rate_limit(os.environ.get(f'RATE_LIMIT_{route.upper()}', default))
+    for route, default in {"login": "10/60", "register": "5/300", "upload": "30/60", "status": "30/60"}.items()
+}
+# "memory" keeps buckets per worker; "mongo" shares them between workers through db.rate_limits
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')
+# Required behind a proxy or load balancer, which otherwise makes every client share the proxy's
+# rate limit bucket. Only enable it when the proxy sets X-Forwarded-For; otherwise clients could
+# pick their own key. A warning is logged once if the header arrives while this is off.
+TRUST_FORWARDED_FOR = os.environ.get('TRUST_FORWARDED_FOR', 'false').lower() == 'true'
+
+# Sessions expire after SESSION_TTL_DAYS without use, but never later than SESSION_MAX_LIFETIME_DAYS
+SESSION_TTL_DAYS = int(os.environ.get('SESSION_TTL_DAYS', '7'))
+SESSION_MAX_LIFETIME_DAYS = int(os.environ.get('SESSION_MAX_LIFETIME_DAYS', '30'))
+# last_seen/expires_at are written at most this often per session rather than on every request
+SESSION_REFRESH_INTERVAL_SECONDS = int(os.environ.get('SESSION_REFRESH_INTERVAL_SECONDS', '3600'))
+# Logging in beyond this many sessions evicts the least recently used ones
+MAX_SESSIONS_PER_USER = int(os.environ.get('MAX_SESSIONS_PER_USER', '10'))
+
+# JSON bodies larger than this many bytes are gzip-compressed
+GZIP_MINIMUM_SIZE = int(os.environ.get('GZIP_MINIMUM_SIZE', '1024'))
+
+# "memory" keeps shared caches (admin emails, AI letters, PDFs) per worker; "mongo" shares them via db.cache_entries
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+# Session lookups are always cached per worker, so keep this short: a logout on one worker
+# takes up to this long to reach the others
+SESSION_CACHE_TTL_SECONDS = int(os.environ.get('SESSION_CACHE_TTL_SECONDS', '30'))
+VISA_LETTER_CACHE_TTL_SECONDS = int(os.environ.get('VISA_LETTER_CACHE_TTL_SECONDS', '86400'))
+VISA_PDF_CACHE_TTL_SECONDS = int(os.environ.get('VISA_PDF_CACHE_TTL_SECONDS', '3600'))
+
+APPLICATION_CACHE_SIZE = int(os.environ.get('APPLICATION_CACHE_SIZE', '1024'))
+# Enable when running several workers so each one evicts entries written by the others
+APPLICATION_CACHE_PUBSUB = os.environ.get('APPLICATION_CACHE_PUBSUB', 'false').lower() == 'true'
+
+# "json" for one JSON object per line, "text" for the classic human-readable format
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json')
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+# Fraction of per-request access lines kept; warnings and errors are never sampled
+LOG_SAMPLE_RATE = float(os.environ.get('LOG_SAMPLE_RATE', '1.0'))
+
+# Set per request (and inherited by tasks it spawns) so every log line can be correlated
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+application_id_var: ContextVar[Optional[str]] = ContextVar("application_id", default=None)
+
+# Attributes every LogRecord has; anything else was passed through extra= and is logged as a field
+STANDARD_LOG_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "sampled"}
+
+class LogContextFilter(logging.Filter):
+    """Stamp records with the request and application ids from the calling context"""
+    
+    def filter(self, record):
+        if getattr(record, "request_id", None) is None:
+            record.request_id = request_id_var.get()
+        if getattr(record, "application_id", None) is None:
+            record.application_id = application_id_var.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records logged with extra={"sampled": True}"""
+    
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+    
+    def filter(self, record):
+        if getattr(record, "sampled", False) and record.levelno < logging.WARNING:
+            return random.random() < self.rate
+        return True
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({
+            key: value for key, value in vars(record).items()
+            if key not in STANDARD_LOG_FIELDS and value is not None
+        })
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class ContextQueueHandler(QueueHandler):
+    """Hands records to the listener thread; formatting and stream writes happen there"""
+    
+    def prepare(self, record):
+        record = logging.makeLogRecord(vars(record))
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            # Tracebacks cannot cross the queue, so render them here
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+log_queue = queue.SimpleQueue()
+log_stream_handler = logging.StreamHandler()
+log_stream_handler.setFormatter(
+    JsonFormatter() if LOG_FORMAT == "json"
+    else logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
+log_listener = QueueListener(log_queue, log_stream_handler, respect_handler_level=True)
+
+def configure_logging():
+    """Route all logging through a queue so handlers never block the event loop on I/O"""
+    queue_handler = ContextQueueHandler(log_queue)
+    queue_handler.addFilter(LogContextFilter())
+    queue_handler.addFilter(SamplingFilter(LOG_SAMPLE_RATE))
+    root = logging.getLogger()
+    root.handlers = [handler for handler in root.handlers if not isinstance(handler, ContextQueueHandler)]
+    root.addHandler(queue_handler)
+    root.setLevel(LOG_LEVEL)
+    log_listener.start()
+    # Scripts importing this module never run the shutdown hook
+    atexit.register(stop_logging)
+
+def stop_logging():
+    """Write out everything still queued; safe to call more than once"""
+    if log_listener._thread is not None:
+        log_listener.stop()
+
+configure_logging()
+logger = logging.getLogger(__name__)
+
+async def bind_log_context(request: Request):
+    # Runs after routing, so path parameters are known; the handler shares this context
+    application_id = request.path_params.get("application_id")
+    if application_id:
+        application_id_var.set(application_id)
+
 app = FastAPI()
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", dependencies=[Depends(bind_log_context)])
 
 class User(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -59,6 +263,17 @@ class UserLogin(BaseModel):
 class SessionData(BaseModel):
     session_id: str
 
+class ApplicationDocument(BaseModel):
+    """Metadata for an uploaded document; the bytes are fetched separately"""
+    model_config = ConfigDict(extra="ignore")
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+    uploaded_at: Optional[datetime] = None
+
+class ApplicationDocumentContent(ApplicationDocument):
+    data: Optional[str] = None
+
 class VisaApplication(BaseModel):
     model_config = ConfigDict(extra="ignore")
     application_id: str
@@ -67,25 +282,638 @@ class VisaApplication(BaseModel):
     status: str
     personal_info: dict
     travel_details: dict
-    documents: dict
+    documents: Dict[str, ApplicationDocument]
+    version: int = 0
     created_at: datetime
     updated_at: datetime
 
+class VisaApplicationWithDocuments(VisaApplication):
+    documents: Dict[str, ApplicationDocumentContent]
+
+class ApplicationSummary(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    application_id: str
+    user_id: str
+    visa_type: str
+    status: str
+    personal_info: dict
+    travel_details: dict
+    version: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+class ApplicationListItem(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    application_id: str
+    visa_type: str
+    status: str
+    created_at: datetime
+    updated_at: datetime
+
+class ApplicationSummaryPage(BaseModel):
+    items: List[ApplicationListItem]
+    next_before: Optional[str] = None
+
 class ApplicationCreate(BaseModel):
     visa_type: str
     personal_info: dict
     travel_details: dict
 
+class ApplicationPatch(BaseModel):
+    version: int
+    visa_type: Optional[str] = None
+    personal_info: Optional[dict] = None
+    travel_details: Optional[dict] = None
+
 class StatusUpdate(BaseModel):
     status: str
     notes: Optional[str] = None
 
+class RoleUpdate(BaseModel):
+    role: str
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks connection checkout waits so pool exhaustion can be told apart from slow queries"""
+    
+    def __init__(self, window: int = 1000):
+        self._waits = deque(maxlen=window)
+        # Motor checks connections out on its executor threads; start and finish share a thread
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.checked_out = 0
+        self.timeouts = 0
+        self.failures = 0
+    
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+    
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        with self._lock:
+            self.checked_out += 1
+            if started is not None:
+                self._waits.append((time.perf_counter() - started) * 1000)
+    
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.timeouts += 1
+            else:
+                self.failures += 1
+    
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        pass
+    
+    def pool_closed(self, event):
+        pass
+    
+    def connection_created(self, event):
+        pass
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        pass
+    
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            in_use, timeouts, failures = self.checked_out, self.timeouts, self.failures
+        
+        def percentile(q: float) -> float:
+            return round(waits[min(len(waits) - 1, int(q * len(waits)))], 2) if waits else 0.0
+        
+        return {
+            "max_size": MONGO_MAX_POOL_SIZE,
+            "min_size": MONGO_MIN_POOL_SIZE,
+            "in_use": in_use,
+            "checkout_wait_ms": {"p50": percentile(0.5), "p95": percentile(0.95), "max": percentile(1.0)},
+            "checkout_timeouts": timeouts,
+            "checkout_failures": failures,
+        }
+
+pool_monitor = PoolMonitor()
+
+def take_token(bucket: Optional[tuple], capacity: int, refill_per_second: float, now: float) -> tuple:
+    """Refill a (tokens, updated_at) bucket and spend one token.
+
+    Returns the new bucket and how long to wait before retrying (0 when admitted).
+    """
+    tokens, updated_at = bucket if bucket else (capacity, now)
+    tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+    if tokens >= 1:
+        return (tokens - 1, now), 0.0
+    return (tokens, now), (1 - tokens) / refill_per_second
+
+class TokenBucketLimiter:
+    """Per-worker token buckets; idle buckets beyond max_keys are forgotten (i.e. refilled)"""
+    
+    def __init__(self, max_keys: int = 10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+    
+    async def acquire(self, key: str, capacity: int, refill_per_second: float) -> float:
+        self._buckets[key], retry_after = take_token(self._buckets.get(key), capacity, refill_per_second, time.monotonic())
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+    
+    def clear(self):
+        self._buckets.clear()
+
+class MongoTokenBucketLimiter:
+    """Token buckets shared by all workers, updated with compare-and-swap on updated_at"""
+    
+    async def acquire(self, key: str, capacity: int, refill_per_second: float, attempts: int = 3) -> float:
+        for _ in range(attempts):
+            doc = await db.rate_limits.find_one({"_id": key})
+            bucket = (doc["tokens"], doc["updated_at"]) if doc else None
+            (tokens, updated_at), retry_after = take_token(bucket, capacity, refill_per_second, time.time())
+            if retry_after:
+                return retry_after
+            fields = {
+                "tokens": tokens,
+                "updated_at": updated_at,
+                # A bucket idle for this long is full again, so the TTL index may drop it
+                "expires_at": datetime.now(timezone.utc) + timedelta(seconds=capacity / refill_per_second)
+            }
+            if doc:
+                result = await db.rate_limits.update_one({"_id": key, "updated_at": doc["updated_at"]}, {"$set": fields})
+                if result.modified_count:
+                    return 0.0
+            else:
+                try:
+                    await db.rate_limits.insert_one({"_id": key, **fields})
+                    return 0.0
+                except DuplicateKeyError:
+                    pass
+        # Lost every race: the bucket is being drained concurrently, so treat it as empty
+        return 1 / refill_per_second
+    
+    def clear(self):
+        pass
+
+rate_limiter = MongoTokenBucketLimiter() if RATE_LIMIT_BACKEND == "mongo" else TokenBucketLimiter()
+
+# Application lifecycle: status -> statuses it may move to
+APPLICATION_TRANSITIONS = {
+    "draft": {"submitted"},
+    "submitted": {"under-review", "approved", "rejected"},
+    "under-review": {"submitted", "approved", "rejected"},
+}
+DECIDED_STATUSES = {"approved", "rejected"}
+APPLICATION_STATUSES = set(APPLICATION_TRANSITIONS) | DECIDED_STATUSES
+# Applicants may only edit their answers before submitting
+EDITABLE_STATUSES = {"draft"}
+
+# Document types the frontend uploads; their inline blobs are projected out of reads
+DOCUMENT_TYPES = ("passport", "photo")
+METADATA_PROJECTION = {"_id": 0, **{f"documents.{doc_type}.data": 0 for doc_type in DOCUMENT_TYPES}}
+# Uploaded types that are safe to render from the API origin; anything else (e.g. an
+# uploaded text/html page) is downloaded as opaque bytes so it cannot run script here
+INLINE_DOCUMENT_TYPES = {"image/jpeg", "image/png", "application/pdf"}
+
+class ApplicationCache:
+    """Bounded LRU of parsed application documents, without document blobs"""
+    
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        # Bumped on every invalidation so a read that raced a write is not cached
+        self.generation = 0
+    
+    def get(self, application_id: str) -> Optional[dict]:
+        app = self._entries.get(application_id)
+        if app is not None:
+            self._entries.move_to_end(application_id)
+        return app
+    
+    def put(self, application_id: str, app: dict, generation: int):
+        if generation != self.generation or self.max_size <= 0:
+            return
+        self._entries[application_id] = app
+        self._entries.move_to_end(application_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+    
+    def invalidate(self, application_id: str):
+        self.generation += 1
+        self._entries.pop(application_id, None)
+    
+    def clear(self):
+        self.generation += 1
+        self._entries.clear()
+
+application_cache = ApplicationCache(APPLICATION_CACHE_SIZE)
+
+class MemoryCacheBackend:
+    """In-process LRU with per-entry expiry; values are returned as stored, not copied"""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+    
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+    
+    async def set(self, key: str, value: Any, ttl_seconds: float):
+        self._entries[key] = (time.monotonic() + ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+    
+    async def clear(self, prefix: str = ""):
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+class MongoCacheBackend:
+    """Cache shared by all workers in db.cache_entries; values must be BSON-encodable.
+
+    A TTL index removes expired entries, which bounds the collection's size
+    instead of LRU eviction.
+    """
+    
+    async def get(self, key: str) -> Any:
+        doc = await db.cache_entries.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}}, {"value": 1}
+        )
+        return doc["value"] if doc else None
+    
+    async def set(self, key: str, value: Any, ttl_seconds: float):
+        await db.cache_entries.replace_one(
+            {"_id": key},
+            {"value": value, "expires_at": datetime.now(timezone.utc) + timedelta(seconds=ttl_seconds)},
+            upsert=True
+        )
+    
+    async def delete(self, key: str):
+        await db.cache_entries.delete_one({"_id": key})
+    
+    async def clear(self, prefix: str = ""):
+        await db.cache_entries.delete_many({"_id": {"$regex": f"^{re.escape(prefix)}"}})
+
+class Cache:
+    """One namespace in a cache backend, with a default TTL and hit/miss counters.
+
+    None means "not cached", so None itself cannot be cached. A TTL of 0 disables the namespace.
+    """
+    
+    def __init__(self, namespace: str, backend, ttl_seconds: float):
+        self.namespace = namespace
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+    
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+    
+    async def get(self, key: str) -> Any:
+        value = await self.backend.get(self._key(key)) if self.ttl_seconds > 0 else None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        if ttl_seconds > 0:
+            await self.backend.set(self._key(key), value, ttl_seconds)
+    
+    async def delete(self, key: str):
+        await self.backend.delete(self._key(key))
+    
+    async def clear(self):
+        await self.backend.clear(f"{self.namespace}:")
+        self.hits = self.misses = 0
+    
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0}
+
+shared_cache_backend = MongoCacheBackend() if CACHE_BACKEND == "mongo" else None
+caches: Dict[str, Cache] = {}
+
+def make_cache(namespace: str, ttl_seconds: float, max_entries: int = 1000, shared: bool = True) -> Cache:
+    """Register a namespace; shared ones use the Mongo backend when CACHE_BACKEND=mongo"""
+    backend = shared_cache_backend if shared and shared_cache_backend else MemoryCacheBackend(max_entries)
+    caches[namespace] = Cache(namespace, backend, ttl_seconds)
+    return caches[namespace]
+
+async def clear_caches():
+    for cache in caches.values():
+        await cache.clear()
+
+# Session lookups happen on every request, and caching them in Mongo would save nothing
+session_cache = make_cache("sessions", SESSION_CACHE_TTL_SECONDS, max_entries=10000, shared=False)
+admin_email_cache = make_cache("admin_emails", ADMIN_RECIPIENTS_TTL_SECONDS, max_entries=1)
+visa_letter_cache = make_cache("visa_letters", VISA_LETTER_CACHE_TTL_SECONDS, max_entries=1000)
+# Rendered PDFs are ~100 KB each, so keep few of them in memory
+visa_pdf_cache = make_cache("visa_pdfs", VISA_PDF_CACHE_TTL_SECONDS, max_entries=100)
+
+async def invalidate_application(application_id: str):
+    """Drop a cached application after a write, telling other workers when shared"""
+    application_cache.invalidate(application_id)
+    if APPLICATION_CACHE_PUBSUB:
+        await db.cache_invalidations.insert_one({
+            "application_id": application_id,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        })
+
+async def listen_for_invalidations():
+    """Tail the capped invalidation log and evict entries written by other workers"""
+    try:
+        await db.create_collection("cache_invalidations", capped=True, size=1024 * 1024, max=10000)
+    except CollectionInvalid:
+        pass
+    
+    # Start after the newest event so history is not replayed on startup
+    latest = await db.cache_invalidations.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+    last_id = latest["_id"] if latest else None
+    
+    while True:
+        try:
+            query = {"_id": {"$gt": last_id}} if last_id else {}
+            cursor = db.cache_invalidations.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+            async for event in cursor:
+                last_id = event["_id"]
+                application_cache.invalidate(event["application_id"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Cache invalidation listener failed: %s", e)
+            # Anything cached while disconnected may have missed an invalidation
+            application_cache.clear()
+        await asyncio.sleep(1)
+
+def strip_document_blobs(app: dict) -> dict:
+    """Keep document metadata but drop the base64 payloads"""
+    app["documents"] = {
+        doc_type: {key: value for key, value in document.items() if key != "data"}
+        for doc_type, document in app.get("documents", {}).items()
+    }
+    return app
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'W/"{digest}"'
+
+def set_validators(response: Response, etag: str, last_modified: Optional[datetime] = None) -> Response:
+    response.headers["ETag"] = etag
+    # Clients may keep a copy but must revalidate it on every use
+    response.headers["Cache-Control"] = "private, no-cache"
+    if last_modified:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        response.headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return response
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match (weak comparison), falling back to If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        if if_none_match.strip() == "*":
+            return True
+        opaque = lambda tag: tag.strip().removeprefix("W/")
+        return opaque(etag) in {opaque(tag) for tag in if_none_match.split(",")}
+    
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+def not_modified_response(etag: str, last_modified: Optional[datetime] = None) -> Response:
+    return set_validators(Response(status_code=304), etag, last_modified)
+
+def application_etag(app: dict, *variant) -> str:
+    updated_at = app['updated_at']
+    return make_etag(app['application_id'], app.get('version', 0), updated_at.isoformat() if isinstance(updated_at, datetime) else updated_at, *variant)
+
+def application_list_etag(scope: str, count: int, last_modified) -> str:
+    return make_etag("list", scope, count, last_modified)
+
+async def application_list_validators(query: dict, include_archived: bool = True) -> tuple:
+    """Count and newest updated_at of a list, answered from the updated_at indexes.
+
+    The newest row comes from a covered sort-and-limit rather than a $max over
+    every document, so revalidation never loads the documents themselves.
+    """
+    collections = [db.visa_applications] + ([db.visa_applications_archive] if include_archived else [])
+    results = await asyncio.gather(*(
+        lookup
+        for collection in collections
+        for lookup in (
+            collection.count_documents(query),
+            collection.find(query, {"_id": 0, "updated_at": 1}).sort("updated_at", -1).limit(1).to_list(1)
+        )
+    ))
+    count = sum(results[0::2])
+    last_modified = max((newest[0]["updated_at"] for newest in results[1::2] if newest), default=None)
+    return count, last_modified
+
+def admin_application_filter(status: Optional[str] = None, visa_type: Optional[str] = None,
+                             created_from: Optional[datetime] = None, created_to: Optional[datetime] = None) -> dict:
+    """Build the Mongo query shared by the admin list and export"""
+    query = {}
+    if status:
+        query["status"] = status
+    if visa_type:
+        query["visa_type"] = visa_type
+    created_range = {}
+    # created_at is stored as a UTC ISO string, so compare against the same format
+    if created_from:
+        if created_from.tzinfo is None:
+            created_from = created_from.replace(tzinfo=timezone.utc)
+        created_range["$gte"] = created_from.astimezone(timezone.utc).isoformat()
+    if created_to:
+        if created_to.tzinfo is None:
+            created_to = created_to.replace(tzinfo=timezone.utc)
+        created_range["$lte"] = created_to.astimezone(timezone.utc).isoformat()
+    if created_range:
+        query["created_at"] = created_range
+    return query
+
+EXPORT_COLUMNS = [
+    "application_id", "user_id", "visa_type", "status", "created_at", "updated_at", "admin_notes",
+    "personal_info.full_name", "personal_info.date_of_birth", "personal_info.nationality",
+    "personal_info.passport_number", "personal_info.passport_expiry", "personal_info.email",
+    "personal_info.phone", "personal_info.address",
+    "travel_details.purpose", "travel_details.arrival_date", "travel_details.departure_date",
+    "travel_details.accommodation",
+]
+EXPORT_PROJECTION = {"_id": 0, "documents": 0}
+
+def flatten_application(app: dict) -> dict:
+    """Flatten personal_info and travel_details into dotted columns"""
+    row = {}
+    for key, value in app.items():
+        if key in ("personal_info", "travel_details") and isinstance(value, dict):
+            for field, field_value in value.items():
+                row[f"{key}.{field}"] = field_value
+        else:
+            row[key] = value
+    return row
+
+async def iter_application_batches(query: dict, include_archived: bool = True):
+    """Yield applications a cursor batch at a time so memory stays flat, live ones before archived ones"""
+    collections = [db.visa_applications] + ([db.visa_applications_archive] if include_archived else [])
+    for collection in collections:
+        # _id order uses the default index, so no in-memory sort on large exports
+        cursor = collection.find(query, EXPORT_PROJECTION).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+        while True:
+            batch = await cursor.to_list(EXPORT_BATCH_SIZE)
+            if batch:
+                yield batch
+            if len(batch) < EXPORT_BATCH_SIZE:
+                break
+
+async def stream_csv(query: dict, include_archived: bool = True):
+    buffer = StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    yield buffer.getvalue()
+    async for batch in iter_application_batches(query, include_archived):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(flatten_application(app) for app in batch)
+        yield buffer.getvalue()
+
+async def stream_ndjson(query: dict, include_archived: bool = True):
+    async for batch in iter_application_batches(query, include_archived):
+        yield "".join(json.dumps(flatten_application(app), default=str) + "\n" for app in batch)
+
+# Only the fields the dashboard renders; served from the (user_id, created_at, application_id) index
+SUMMARY_PROJECTION = {"_id": 0, "application_id": 1, "visa_type": 1, "status": 1, "created_at": 1, "updated_at": 1}
+
 def hash_password(password: str) -> str:
+    import bcrypt
     return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
 
 def verify_password(password: str, hashed: str) -> bool:
+    import bcrypt
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+def parse_session_time(value) -> datetime:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value
+
+def session_expiry(created_at: datetime, now: datetime) -> datetime:
+    return min(now + timedelta(days=SESSION_TTL_DAYS), created_at + timedelta(days=SESSION_MAX_LIFETIME_DAYS))
+
+async def create_session(user_id: str, session_token: str):
+    """Store a new session and evict the user's expired and least recently used ones beyond the cap"""
+    now = datetime.now(timezone.utc)
+    await db.user_sessions.insert_one({
+        "user_id": user_id,
+        "session_token": session_token,
+        "expires_at": session_expiry(now, now).isoformat(),
+        "created_at": now.isoformat(),
+        "last_seen": now.isoformat()
+    })
+    
+    sessions = await db.user_sessions.find(
+        {"user_id": user_id}, {"_id": 0, "session_token": 1, "expires_at": 1}
+    ).sort("last_seen", -1).to_list(None)
+    evicted = [
+        session["session_token"]
+        for position, session in enumerate(sessions)
+        if position >= MAX_SESSIONS_PER_USER or parse_session_time(session["expires_at"]) < now
+    ]
+    if evicted:
+        await db.user_sessions.delete_many({"session_token": {"$in": evicted}})
+        for token in evicted:
+            await session_cache.delete(token)
+
+async def user_session_tokens(user_id: str) -> List[str]:
+    """Tokens of every session a user holds, for dropping them from the session cache"""
+    sessions = await db.user_sessions.find({"user_id": user_id}, {"_id": 0, "session_token": 1}).to_list(None)
+    return [session["session_token"] for session in sessions]
+
+async def refresh_session(session_doc: dict, now: datetime) -> bool:
+    """Slide the expiry forward (in session_doc too), writing at most once per SESSION_REFRESH_INTERVAL_SECONDS"""
+    last_seen = parse_session_time(session_doc.get("last_seen") or session_doc["created_at"])
+    if (now - last_seen).total_seconds() < SESSION_REFRESH_INTERVAL_SECONDS:
+        return False
+    created_at = parse_session_time(session_doc["created_at"])
+    session_doc["last_seen"] = now.isoformat()
+    session_doc["expires_at"] = session_expiry(created_at, now).isoformat()
+    await db.user_sessions.update_one(
+        {"session_token": session_doc["session_token"]},
+        {"$set": {"last_seen": session_doc["last_seen"], "expires_at": session_doc["expires_at"]}}
+    )
+    return True
+
+def set_session_cookie(response: Response, session_token: str):
+    # The cookie lives as long as a session can; the server-side expiry does the sliding
+    response.set_cookie(
+        key="session_token",
+        value=session_token,
+        httponly=True,
+        secure=True,
+        samesite="none",
+        path="/",
+        max_age=SESSION_MAX_LIFETIME_DAYS*24*60*60
+    )
+
+forwarded_for_warning_logged = False
+
+def client_ip(request: Request) -> str:
+    global forwarded_for_warning_logged
+    forwarded_for = request.headers.get('X-Forwarded-For')
+    if TRUST_FORWARDED_FOR and forwarded_for:
+        return forwarded_for.split(',')[0].strip()
+    if forwarded_for and not forwarded_for_warning_logged:
+        forwarded_for_warning_logged = True
+        logger.warning("X-Forwarded-For received but TRUST_FORWARDED_FOR is off; rate limits key on the proxy address")
+    return request.client.host if request.client else "unknown"
+
+async def enforce_rate_limit(route: str, client_key: str):
+    """Spend a token from the route's bucket for this client, or reject with 429 and Retry-After"""
+    limit = RATE_LIMITS.get(route)
+    if not limit:
+        return
+    capacity, refill_per_second = limit
+    retry_after = await rate_limiter.acquire(f"{route}:{client_key}", capacity, refill_per_second)
+    if retry_after > 0:
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
+
 async def get_current_user(request: Request, session_token: Optional[str] = Cookie(None)) -> User:
     token = session_token
     if not token:
@@ -96,63 +924,371 @@ async def get_current_user(request: Request, session_token: Optional[str] = Cook
     if not token:
         raise HTTPException(status_code=401, detail="Not authenticated")
     
-    session_doc = await db.user_sessions.find_one({"session_token": token}, {"_id": 0})
-    if not session_doc:
-        raise HTTPException(status_code=401, detail="Invalid session")
-    
-    expires_at = session_doc["expires_at"]
-    if isinstance(expires_at, str):
-        expires_at = datetime.fromisoformat(expires_at)
-    if expires_at.tzinfo is None:
-        expires_at = expires_at.replace(tzinfo=timezone.utc)
-    if expires_at < datetime.now(timezone.utc):
+    cached = await session_cache.get(token)
+    if cached:
+        session_doc, user_doc = cached["session"], cached["user"]
+    else:
+        session_doc = await db.user_sessions.find_one({"session_token": token}, {"_id": 0})
+        if not session_doc:
+            raise HTTPException(status_code=401, detail="Invalid session")
+    
+    now = datetime.now(timezone.utc)
+    if parse_session_time(session_doc["expires_at"]) < now:
+        await session_cache.delete(token)
         raise HTTPException(status_code=401, detail="Session expired")
+    refreshed = await refresh_session(session_doc, now)
     
-    user_doc = await db.users.find_one({"user_id": session_doc["user_id"]}, {"_id": 0})
-    if not user_doc:
-        raise HTTPException(status_code=401, detail="User not found")
+    if not cached:
+        user_doc = await db.users.find_one({"user_id": session_doc["user_id"]}, {"_id": 0})
+        if not user_doc:
+            raise HTTPException(status_code=401, detail="User not found")
+    if refreshed or not cached:
+        await session_cache.set(token, {"session": session_doc, "user": user_doc})
     
-    if isinstance(user_doc['created_at'], str):
-        user_doc['created_at'] = datetime.fromisoformat(user_doc['created_at'])
+    user = dict(user_doc)
+    if isinstance(user['created_at'], str):
+        user['created_at'] = datetime.fromisoformat(user['created_at'])
     
-    return User(**user_doc)
+    return User(**user)
 
-async def generate_visa_document_with_ai(application: dict) -> str:
-    """Generate visa document content using AI"""
-    try:
-        chat = LlmChat(
-            api_key=OPENAI_API_KEY,
-            session_id=f"visa_{application['application_id']}",
-            system_message="You are an official document generator for the Republic of Meowls Immigration Department. Generate formal, professional visa documents."
-        ).with_model("openai", "gpt-4o")
+async def transition_application(application_id: str, new_status: str, owner_id: Optional[str] = None, extra_fields: Optional[dict] = None) -> dict:
+    """Move an application to new_status with a single conditional write.
+
+    Returns the updated document. Only one caller can win a given transition,
+    so side effects (emails) should be keyed off the returned document.
+    """
+    if new_status not in APPLICATION_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Unknown status: {new_status}")
+    
+    from_statuses = [status for status, targets in APPLICATION_TRANSITIONS.items() if new_status in targets]
+    query = {"application_id": application_id, "status": {"$in": from_statuses}}
+    if owner_id:
+        query["user_id"] = owner_id
+    
+    update_data = {
+        "status": new_status,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    if new_status in DECIDED_STATUSES:
+        update_data["decided_at"] = update_data["updated_at"]
+    update_data.update(extra_fields or {})
+    
+    updated_app = await db.visa_applications.find_one_and_update(
+        query,
+        {"$set": update_data, "$inc": {"version": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if updated_app:
+        await invalidate_application(application_id)
+        return updated_app
+    
+    # The write did not match; look the application up only to explain why
+    app = await db.visa_applications.find_one({"application_id": application_id}, {"_id": 0, "user_id": 1, "status": 1})
+    if not app:
+        raise HTTPException(status_code=404, detail="Application not found")
+    if owner_id and app["user_id"] != owner_id:
+        raise HTTPException(status_code=403, detail="Access denied")
+    raise HTTPException(status_code=409, detail=f"Cannot change application status from {app['status']} to {new_status}")
+
+def compress_document_blobs(app: dict) -> dict:
+    """Store each base64 document as zlib-compressed binary for the archive"""
+    for document in app.get("documents", {}).values():
+        if isinstance(document, dict) and isinstance(document.get("data"), str):
+            document["data"] = zlib.compress(base64.b64decode(document["data"]))
+            document["compression"] = "zlib"
+    return app
+
+def restore_document_blobs(app: dict) -> dict:
+    """Undo compress_document_blobs so archived reads look like live ones"""
+    for document in app.get("documents", {}).values():
+        if isinstance(document, dict) and document.pop("compression", None) == "zlib" and "data" in document:
+            document["data"] = base64.b64encode(zlib.decompress(document["data"])).decode('utf-8')
+    return app
+
+async def find_applications(query: dict, projection: dict, limit: int, include_archived: bool = True) -> List[dict]:
+    """Up to limit matching applications, live ones first, then the archive.
+
+    Projections that leave out document data skip decompression entirely;
+    restore_document_blobs then only drops the compression markers.
+    """
+    apps = await db.visa_applications.find(query, projection).to_list(limit)
+    if include_archived and len(apps) < limit:
+        archived = await db.visa_applications_archive.find(query, projection).to_list(limit - len(apps))
+        apps += [restore_document_blobs(app) for app in archived]
+    return apps
+
+async def find_application(application_id: str, projection: dict) -> Optional[dict]:
+    """Look an application up in the live collection, then the archive"""
+    app = await db.visa_applications.find_one({"application_id": application_id}, projection)
+    if app:
+        return app
+    app = await db.visa_applications_archive.find_one({"application_id": application_id}, projection)
+    return restore_document_blobs(app) if app else None
+
+async def archive_decided_applications(older_than_days: int = None, batch_size: int = None, pause_seconds: float = None) -> int:
+    """Move applications decided before the cutoff into the archive collection.
+
+    Runs in small batches with a pause between them so it does not compete
+    with live traffic. Safe to rerun or run from several workers: archive
+    writes are upserts and the live copy is only deleted if it is unchanged.
+    """
+    older_than_days = ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    batch_size = batch_size or ARCHIVE_BATCH_SIZE
+    pause_seconds = ARCHIVE_BATCH_PAUSE_SECONDS if pause_seconds is None else pause_seconds
+    
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat()
+    query = {
+        "status": {"$in": sorted(DECIDED_STATUSES)},
+        "$or": [
+            {"decided_at": {"$lt": cutoff}},
+            # Decided before decided_at was recorded
+            {"decided_at": {"$exists": False}, "updated_at": {"$lt": cutoff}}
+        ]
+    }
+    
+    archived = 0
+    while True:
+        batch = await db.visa_applications.find(query).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
         
-        user_message = UserMessage(
-            text=f"""Generate a professional visa approval document with the following details:
+        archived_at = datetime.now(timezone.utc).isoformat()
+        await db.visa_applications_archive.bulk_write([
+            ReplaceOne(
+                {"application_id": app["application_id"]},
+                {**compress_document_blobs({k: v for k, v in app.items() if k != "_id"}), "archived_at": archived_at},
+                upsert=True
+            )
+            for app in batch
+        ], ordered=False)
+        
+        result = await db.visa_applications.delete_many({"$or": [
+            {"_id": app["_id"], "version": app.get("version")} for app in batch
+        ]})
+        archived += result.deleted_count
+        for app in batch:
+            application_cache.invalidate(app["application_id"])
+        
+        if len(batch) < batch_size:
+            break
+        await asyncio.sleep(pause_seconds)
+    
+    if archived:
+        logger.info("Archived %d decided applications older than %d days", archived, older_than_days)
+    return archived
 
-Applicant Name: {application['personal_info']['full_name']}
-Nationality: {application['personal_info']['nationality']}
-Passport Number: {application['personal_info']['passport_number']}
-Visa Type: {application['visa_type'].title()}
-Purpose: {application['travel_details']['purpose']}
-Arrival Date: {application['travel_details']['arrival_date']}
-Departure Date: {application['travel_details']['departure_date']}
-Application ID: {application['application_id']}
+async def run_archiver():
+    while True:
+        try:
+            await archive_decided_applications()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Application archiver failed: %s", e)
+        await asyncio.sleep(ARCHIVE_INTERVAL_SECONDS)
 
-Create a formal visa approval letter that includes:
-1. Official letterhead greeting
-2. Approval statement
-3. Visa validity details
-4. Important notes about payment at immigration
-5. Professional closing
+async def hash_upload(file: UploadFile) -> tuple:
+    """Stream an upload through SHA-256 without holding it in memory"""
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := await file.read(DOCUMENT_CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
 
-Keep it concise and professional - max 300 words."""
+async def acquire_blob(sha256: str, file: UploadFile, size: int) -> bool:
+    """Take a reference on a content-addressed blob, storing it only if it is new"""
+    existing = await db.document_blobs.find_one_and_update(
+        {"_id": sha256},
+        {"$inc": {"ref_count": 1}},
+        projection={"_id": 1}
+    )
+    if existing:
+        return False
+    
+    await file.seek(0)
+    content = await file.read()
+    # Upsert so two first-time uploads of the same file both count
+    await db.document_blobs.update_one(
+        {"_id": sha256},
+        {"$inc": {"ref_count": 1}, "$setOnInsert": {
+            "data": content,
+            "size": size,
+            "created_at": datetime.now(timezone.utc).isoformat()
+        }},
+        upsert=True
+    )
+    return True
+
+async def release_blob(sha256: str):
+    await db.document_blobs.update_one({"_id": sha256}, {"$inc": {"ref_count": -1}})
+
+async def collect_unreferenced_blobs() -> int:
+    """Delete blobs whose last reference was released"""
+    # A concurrent acquire either lands first (count > 0, kept) or re-inserts the blob
+    result = await db.document_blobs.delete_many({"ref_count": {"$lte": 0}})
+    if result.deleted_count:
+        logger.info("Deleted %d unreferenced document blobs", result.deleted_count)
+    return result.deleted_count
+
+async def run_blob_collector():
+    await db.document_blobs.create_index("ref_count")
+    while True:
+        try:
+            await collect_unreferenced_blobs()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error("Document blob collector failed: %s", e)
+        await asyncio.sleep(BLOB_GC_INTERVAL_SECONDS)
+
+async def load_document_data(app: dict, doc_types=None) -> dict:
+    """Fill in base64 data for documents stored by hash (older ones are inline)"""
+    await load_batch_document_data([app], doc_types)
+    return app
+
+async def load_batch_document_data(apps: List[dict], doc_types=None) -> List[dict]:
+    """load_document_data for many applications with a single blob query"""
+    documents = [
+        document
+        for app in apps
+        for doc_type, document in app.get("documents", {}).items()
+        if (doc_types is None or doc_type in doc_types) and isinstance(document, dict)
+        and document.get("sha256") and "data" not in document
+    ]
+    if not documents:
+        return apps
+    
+    hashes = list({document["sha256"] for document in documents})
+    blobs = await db.document_blobs.find({"_id": {"$in": hashes}}, {"data": 1}).to_list(len(hashes))
+    data_by_hash = {blob["_id"]: base64.b64encode(blob["data"]).decode('utf-8') for blob in blobs}
+    for document in documents:
+        if document["sha256"] in data_by_hash:
+            document["data"] = data_by_hash[document["sha256"]]
+    return apps
+
+async def get_admin_emails() -> List[str]:
+    """Admin addresses, cached for ADMIN_RECIPIENTS_TTL_SECONDS"""
+    emails = await admin_email_cache.get("all")
+    if emails is None:
+        admin_users = await db.users.find({"role": "admin"}, {"_id": 0, "email": 1}).to_list(100)
+        emails = [admin["email"] for admin in admin_users]
+        await admin_email_cache.set("all", emails)
+    return emails
+
+async def invalidate_admin_emails():
+    await admin_email_cache.delete("all")
+
+admin_notification_queue = []
+# The event loop only keeps weak references to tasks, so fire-and-forget sends are held here until done
+email_tasks = set()
+
+def send_in_background(coroutine):
+    task = asyncio.create_task(coroutine)
+    email_tasks.add(task)
+    task.add_done_callback(email_tasks.discard)
+    return task
+
+def queue_admin_notification(application: dict, notes: str = ""):
+    """Record a decision for the next batched admin email"""
+    admin_notification_queue.append({
+        "application_id": application['application_id'],
+        "full_name": application['personal_info'].get('full_name', ''),
+        "visa_type": application['visa_type'],
+        "status": application['status'],
+        "notes": notes,
+        "decided_at": application.get('decided_at') or application['updated_at']
+    })
+    trim_admin_notification_queue()
+    if ADMIN_NOTIFICATION_FLUSH_SECONDS <= 0:
+        send_in_background(flush_admin_notifications())
+
+def trim_admin_notification_queue():
+    overflow = len(admin_notification_queue) - ADMIN_NOTIFICATION_QUEUE_LIMIT
+    if overflow > 0:
+        del admin_notification_queue[:overflow]
+        logger.warning("Admin notification queue full; dropped %d oldest decisions", overflow)
+
+async def flush_admin_notifications() -> int:
+    """Send every queued decision to the admins in a single email"""
+    if not admin_notification_queue:
+        return 0
+    
+    batch = admin_notification_queue[:]
+    admin_notification_queue.clear()
+    try:
+        admin_emails = await get_admin_emails()
+        if not admin_emails:
+            return 0
+        
+        rows = "".join(
+            f"""<tr>
+                <td style="padding: 8px; border-bottom: 1px solid #e2e8f0;">{escape(item['application_id'])}</td>
+                <td style="padding: 8px; border-bottom: 1px solid #e2e8f0;">{escape(item['full_name'])}</td>
+                <td style="padding: 8px; border-bottom: 1px solid #e2e8f0;">{escape(item['visa_type'].title())}</td>
+                <td style="padding: 8px; border-bottom: 1px solid #e2e8f0;"><strong>{escape(item['status'].upper())}</strong></td>
+                <td style="padding: 8px; border-bottom: 1px solid #e2e8f0;">{escape(item['notes'] or '')}</td>
+            </tr>"""
+            for item in batch
         )
+        html_content = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 700px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #0F172A;">Visa decisions ({len(batch)})</h2>
+                <table style="width: 100%; border-collapse: collapse; font-size: 13px;">
+                    <tr style="background-color: #F1F5F9; text-align: left;">
+                        <th style="padding: 8px;">Application ID</th>
+                        <th style="padding: 8px;">Applicant</th>
+                        <th style="padding: 8px;">Visa Type</th>
+                        <th style="padding: 8px;">Decision</th>
+                        <th style="padding: 8px;">Notes</th>
+                    </tr>
+                    {rows}
+                </table>
+            </div>
+        </body>
+        </html>
+        """
         
-        response = await chat.send_message(user_message)
-        return response
+        params = {
+            "from": SENDER_EMAIL,
+            "to": admin_emails,
+            "subject": f"Meowls visa decisions: {len(batch)} update(s)",
+            "html": html_content
+        }
+        await asyncio.to_thread(send_email, params)
+        logger.info("Admin notification sent to %d admins covering %d decisions", len(admin_emails), len(batch))
+        return len(batch)
     except Exception as e:
-        logger.error(f"AI generation failed: {str(e)}")
-        return f"""REPUBLIC OF MEOWLS
+        logger.error("Failed to send admin notification: %s", e)
+        # Keep the decisions for the next flush
+        admin_notification_queue[:0] = batch
+        trim_admin_notification_queue()
+        return 0
+
+async def run_admin_notifier():
+    while True:
+        await asyncio.sleep(ADMIN_NOTIFICATION_FLUSH_SECONDS)
+        await flush_admin_notifications()
+
+def send_email(params: dict):
+    """Send one email through Resend (blocking; run it in a thread)"""
+    import resend
+    resend.api_key = RESEND_API_KEY
+    return resend.Emails.send(params)
+
+def warm_up_optional_modules():
+    for name in OPTIONAL_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            logger.warning("Could not preload %s: %s", name, e)
+
+def default_visa_letter(application: dict) -> str:
+    """Template approval letter, used when the AI letter is unavailable and for bulk re-renders"""
+    return f"""REPUBLIC OF MEOWLS
 IMMIGRATION DEPARTMENT
 
 VISA APPROVAL NOTICE
@@ -182,8 +1318,58 @@ Welcome to Meowls!
 Immigration Department
 Republic of Meowls"""
 
+async def generate_visa_document_with_ai(application: dict) -> str:
+    """Generate visa document content using AI, reusing the letter for an unchanged application"""
+    cache_key = f"{application['application_id']}:{application.get('version', 0)}"
+    letter_text = await visa_letter_cache.get(cache_key)
+    if letter_text is not None:
+        return letter_text
+    try:
+        from emergentintegrations.llm.chat import LlmChat, UserMessage
+        chat = LlmChat(
+            api_key=OPENAI_API_KEY,
+            session_id=f"visa_{application['application_id']}",
+            system_message="You are an official document generator for the Republic of Meowls Immigration Department. Generate formal, professional visa documents."
+        ).with_model("openai", "gpt-4o")
+        
+        user_message = UserMessage(
+            text=f"""Generate a professional visa approval document with the following details:
+
+Applicant Name: {application['personal_info']['full_name']}
+Nationality: {application['personal_info']['nationality']}
+Passport Number: {application['personal_info']['passport_number']}
+Visa Type: {application['visa_type'].title()}
+Purpose: {application['travel_details']['purpose']}
+Arrival Date: {application['travel_details']['arrival_date']}
+Departure Date: {application['travel_details']['departure_date']}
+Application ID: {application['application_id']}
+
+Create a formal visa approval letter that includes:
+1. Official letterhead greeting
+2. Approval statement
+3. Visa validity details
+4. Important notes about payment at immigration
+5. Professional closing
+
+Keep it concise and professional - max 300 words."""
+        )
+        
+        response = await chat.send_message(user_message)
+        await visa_letter_cache.set(cache_key, response)
+        return response
+    except Exception as e:
+        logger.error("AI generation failed: %s", e, extra={"application_id": application['application_id']})
+        return default_visa_letter(application)
+
 def create_visa_pdf(content: str, application: dict) -> BytesIO:
     """Create a PDF visa document"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image as RLImage
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=0.5*inch, bottomMargin=0.5*inch)
     
@@ -229,7 +1415,6 @@ def create_visa_pdf(content: str, application: dict) -> BytesIO:
         if application.get('documents', {}).get('photo'):
             photo_data = application['documents']['photo']
             if isinstance(photo_data, dict) and 'data' in photo_data:
-                import base64
                 photo_bytes = base64.b64decode(photo_data['data'])
                 photo_buffer = BytesIO(photo_bytes)
                 
@@ -246,7 +1431,7 @@ def create_visa_pdf(content: str, application: dict) -> BytesIO:
                 story.append(photo_table)
                 story.append(Spacer(1, 0.2*inch))
     except Exception as e:
-        logger.error(f"Failed to add photo to PDF: {str(e)}")
+        logger.error("Failed to add photo to PDF: %s", e, extra={"application_id": application['application_id']})
     
     for line in content.split('\n'):
         if line.strip():
@@ -277,18 +1462,22 @@ def create_visa_pdf(content: str, application: dict) -> BytesIO:
     buffer.seek(0)
     return buffer
 
+async def render_visa_pdf(content: str, application: dict) -> bytes:
+    """create_visa_pdf off the event loop, cached per letter and issue date (e.g. for email retries)"""
+    issue_date = datetime.now(timezone.utc).date().isoformat()
+    cache_key = f"{application['application_id']}:{issue_date}:{hashlib.sha256(content.encode('utf-8')).hexdigest()}"
+    pdf_bytes = await visa_pdf_cache.get(cache_key)
+    if pdf_bytes is None:
+        pdf_bytes = (await asyncio.to_thread(create_visa_pdf, content, application)).getvalue()
+        await visa_pdf_cache.set(cache_key, pdf_bytes)
+    return pdf_bytes
+
 async def send_approval_email(application: dict):
     """Send visa approval email with AI-generated document"""
     try:
+        application = await load_document_data(application, ["photo"])
         visa_content = await generate_visa_document_with_ai(application)
-        pdf_buffer = create_visa_pdf(visa_content, application)
-        
-        # Get all admin emails to include in recipients
-        admin_users = await db.users.find({"role": "admin"}, {"_id": 0, "email": 1}).to_list(100)
-        admin_emails = [admin["email"] for admin in admin_users]
-        
-        # Combine applicant email with all admin emails
-        all_recipients = [application['personal_info']['email']] + admin_emails
+        pdf_bytes = await render_visa_pdf(visa_content, application)
         
         html_content = f"""
         <html>
@@ -331,32 +1520,25 @@ async def send_approval_email(application: dict):
         
         params = {
             "from": SENDER_EMAIL,
-            "to": all_recipients,
+            "to": [application['personal_info']['email']],
             "subject": "🎉 Your Meowls Visa is APPROVED!",
             "html": html_content,
             "attachments": [{
                 "filename": f"meowls_visa_{application['application_id']}.pdf",
-                "content": list(pdf_buffer.getvalue())
+                "content": list(pdf_bytes)
             }]
         }
         
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        logger.info(f"Approval email sent to {len(all_recipients)} recipients: applicant + {len(admin_emails)} admins")
+        email = await asyncio.to_thread(send_email, params)
+        logger.info("Approval email sent to applicant", extra={"application_id": application['application_id']})
         return True
-    except Exception as e:
-        logger.error(f"Failed to send approval email: {str(e)}")
+    except Exception:
+        logger.exception("Failed to send approval email", extra={"application_id": application['application_id']})
         return False
 
 async def send_rejection_email(application: dict, notes: str = ""):
     """Send kind visa rejection email"""
     try:
-        # Get all admin emails to include in recipients
-        admin_users = await db.users.find({"role": "admin"}, {"_id": 0, "email": 1}).to_list(100)
-        admin_emails = [admin["email"] for admin in admin_users]
-        
-        # Combine applicant email with all admin emails
-        all_recipients = [application['personal_info']['email']] + admin_emails
-        
         html_content = f"""
         <html>
         <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
@@ -404,20 +1586,21 @@ async def send_rejection_email(application: dict, notes: str = ""):
         
         params = {
             "from": SENDER_EMAIL,
-            "to": all_recipients,
+            "to": [application['personal_info']['email']],
             "subject": "Meowls Visa Application Update",
             "html": html_content
         }
         
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        logger.info(f"Rejection email sent to {len(all_recipients)} recipients: applicant + {len(admin_emails)} admins")
+        email = await asyncio.to_thread(send_email, params)
+        logger.info("Rejection email sent to applicant", extra={"application_id": application['application_id']})
         return True
-    except Exception as e:
-        logger.error(f"Failed to send rejection email: {str(e)}")
+    except Exception:
+        logger.exception("Failed to send rejection email", extra={"application_id": application['application_id']})
         return False
 
 @api_router.post("/auth/register")
-async def register(user_data: UserRegister, response: Response):
+async def register(user_data: UserRegister, request: Request, response: Response):
+    await enforce_rate_limit("register", client_ip(request))
     existing = await db.users.find_one({"email": user_data.email}, {"_id": 0})
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
@@ -438,23 +1621,8 @@ async def register(user_data: UserRegister, response: Response):
     await db.users.insert_one(user)
     
     session_token = f"session_{uuid.uuid4().hex}"
-    session = {
-        "user_id": user_id,
-        "session_token": session_token,
-        "expires_at": (datetime.now(timezone.utc) + timedelta(days=7)).isoformat(),
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.user_sessions.insert_one(session)
-    
-    response.set_cookie(
-        key="session_token",
-        value=session_token,
-        httponly=True,
-        secure=True,
-        samesite="none",
-        path="/",
-        max_age=7*24*60*60
-    )
+    await create_session(user_id, session_token)
+    set_session_cookie(response, session_token)
     
     user_copy = user.copy()
     user_copy.pop('password_hash', None)
@@ -462,7 +1630,8 @@ async def register(user_data: UserRegister, response: Response):
     return User(**user_copy)
 
 @api_router.post("/auth/login")
-async def login(credentials: UserLogin, response: Response):
+async def login(credentials: UserLogin, request: Request, response: Response):
+    await enforce_rate_limit("login", client_ip(request))
     user_doc = await db.users.find_one({"email": credentials.email}, {"_id": 0})
     if not user_doc:
         raise HTTPException(status_code=401, detail="Invalid credentials")
@@ -471,23 +1640,8 @@ async def login(credentials: UserLogin, response: Response):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     session_token = f"session_{uuid.uuid4().hex}"
-    session = {
-        "user_id": user_doc["user_id"],
-        "session_token": session_token,
-        "expires_at": (datetime.now(timezone.utc) + timedelta(days=7)).isoformat(),
-        "created_at": datetime.now(timezone.utc).isoformat()
-    }
-    await db.user_sessions.insert_one(session)
-    
-    response.set_cookie(
-        key="session_token",
-        value=session_token,
-        httponly=True,
-        secure=True,
-        samesite="none",
-        path="/",
-        max_age=7*24*60*60
-    )
+    await create_session(user_doc["user_id"], session_token)
+    set_session_cookie(response, session_token)
     
     user_copy = user_doc.copy()
     user_copy.pop('password_hash', None)
@@ -495,16 +1649,20 @@ async def login(credentials: UserLogin, response: Response):
         user_copy['created_at'] = datetime.fromisoformat(user_copy['created_at'])
     return User(**user_copy)
 
+def fetch_oauth_session(session_id: str) -> dict:
+    import requests
+    ext_response = requests.get(
+        "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
+        headers={"X-Session-ID": session_id},
+        timeout=10
+    )
+    ext_response.raise_for_status()
+    return ext_response.json()
+
 @api_router.post("/auth/session")
 async def process_google_session(session_data: SessionData, response: Response):
     try:
-        ext_response = requests.get(
-            "https://demobackend.emergentagent.com/auth/v1/env/oauth/session-data",
-            headers={"X-Session-ID": session_data.session_id},
-            timeout=10
-        )
-        ext_response.raise_for_status()
-        data = ext_response.json()
+        data = fetch_oauth_session(session_data.session_id)
         
         user_doc = await db.users.find_one({"email": data["email"]}, {"_id": 0})
         
@@ -530,23 +1688,8 @@ async def process_google_session(session_data: SessionData, response: Response):
             await db.users.insert_one(user)
         
         session_token = data["session_token"]
-        session = {
-            "user_id": user_id,
-            "session_token": session_token,
-            "expires_at": (datetime.now(timezone.utc) + timedelta(days=7)).isoformat(),
-            "created_at": datetime.now(timezone.utc).isoformat()
-        }
-        await db.user_sessions.insert_one(session)
-        
-        response.set_cookie(
-            key="session_token",
-            value=session_token,
-            httponly=True,
-            secure=True,
-            samesite="none",
-            path="/",
-            max_age=7*24*60*60
-        )
+        await create_session(user_id, session_token)
+        set_session_cookie(response, session_token)
         
         user_doc = await db.users.find_one({"user_id": user_id}, {"_id": 0})
         user_copy = user_doc.copy()
@@ -572,10 +1715,23 @@ async def logout(request: Request, response: Response, session_token: Optional[s
     
     if token:
         await db.user_sessions.delete_one({"session_token": token})
+        await session_cache.delete(token)
     
     response.delete_cookie(key="session_token", path="/", samesite="none", secure=True)
     return {"message": "Logged out successfully"}
 
+@api_router.post("/auth/logout-all")
+async def logout_everywhere(request: Request, response: Response, session_token: Optional[str] = Cookie(None)):
+    user = await get_current_user(request, session_token)
+    # Cached sessions are keyed by token, which the delete does not return
+    tokens = await user_session_tokens(user.user_id)
+    result = await db.user_sessions.delete_many({"user_id": user.user_id})
+    for token in tokens:
+        await session_cache.delete(token)
+    
+    response.delete_cookie(key="session_token", path="/", samesite="none", secure=True)
+    return {"message": "Logged out of all sessions", "sessions_ended": result.deleted_count}
+
 @api_router.post("/applications")
 async def create_application(app_data: ApplicationCreate, request: Request, session_token: Optional[str] = Cookie(None)):
     user = await get_current_user(request, session_token)
@@ -589,6 +1745,7 @@ async def create_application(app_data: ApplicationCreate, request: Request, sess
         "personal_info": app_data.personal_info,
         "travel_details": app_data.travel_details,
         "documents": {},
+        "version": 1,
         "created_at": datetime.now(timezone.utc).isoformat(),
         "updated_at": datetime.now(timezone.utc).isoformat()
     }
@@ -601,10 +1758,27 @@ async def create_application(app_data: ApplicationCreate, request: Request, sess
     return VisaApplication(**app_copy)
 
 @api_router.get("/applications")
-async def get_applications(request: Request, session_token: Optional[str] = Cookie(None)):
+async def get_applications(request: Request, response: Response, view: str = "full", limit: int = SUMMARY_PAGE_SIZE,
+                           before: Optional[str] = None, session_token: Optional[str] = Cookie(None)):
     user = await get_current_user(request, session_token)
+    query = {"user_id": user.user_id}
+    scope = f"user:{user.user_id}:{view}:{limit}:{before}"
+    
+    if view not in ("full", "summary"):
+        raise HTTPException(status_code=400, detail="view must be full or summary")
+    
+    # The full list always needs the validators: its own rows are capped at 1000 and cannot supply them
+    if view == "full" or request.headers.get("if-none-match"):
+        count, last_modified = await application_list_validators(query)
+        etag = application_list_etag(scope, count, last_modified)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
     
-    apps = await db.visa_applications.find({"user_id": user.user_id}, {"_id": 0}).to_list(1000)
+    if view == "summary":
+        return await get_application_summaries(response, query, scope, limit, before)
+    
+    apps = await find_applications(query, METADATA_PROJECTION, 1000)
+    set_validators(response, etag)
     
     for app in apps:
         if isinstance(app['created_at'], str):
@@ -614,24 +1788,132 @@ async def get_applications(request: Request, session_token: Optional[str] = Cook
     
     return [VisaApplication(**app) for app in apps]
 
+async def get_application_summaries(response: Response, query: dict, scope: str, limit: int, before: Optional[str]) -> ApplicationSummaryPage:
+    """Newest-first page of list fields, paginated on (created_at, application_id).
+
+    The cursor is "created_at|application_id" so rows sharing a created_at are
+    neither skipped nor repeated across pages; a bare created_at is still accepted.
+    """
+    limit = max(1, min(limit, SUMMARY_MAX_PAGE_SIZE))
+    if before:
+        created_at, _, application_id = before.partition("|")
+        if application_id:
+            query = {**query, "$or": [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "application_id": {"$lt": application_id}}
+            ]}
+        else:
+            query = {**query, "created_at": {"$lt": created_at}}
+    
+    # Fetch one extra row to know whether another page exists; archived applications
+    # are paged alongside live ones, so merge the two newest-first runs
+    apps = []
+    for collection in (db.visa_applications, db.visa_applications_archive):
+        apps += await collection.find(query, SUMMARY_PROJECTION).sort(
+            [("created_at", -1), ("application_id", -1)]
+        ).limit(limit + 1).to_list(limit + 1)
+    apps = sorted(apps, key=lambda app: (app['created_at'], app['application_id']), reverse=True)[:limit + 1]
+    next_before = f"{apps[limit - 1]['created_at']}|{apps[limit - 1]['application_id']}" if len(apps) > limit else None
+    apps = apps[:limit]
+    
+    if not before and next_before is None:
+        # List validators describe the whole list, so only a complete first page gets an ETag
+        set_validators(response, application_list_etag(scope, len(apps), max((app['updated_at'] for app in apps), default=None)))
+    
+    for app in apps:
+        if isinstance(app['created_at'], str):
+            app['created_at'] = datetime.fromisoformat(app['created_at'])
+        if isinstance(app['updated_at'], str):
+            app['updated_at'] = datetime.fromisoformat(app['updated_at'])
+    
+    return ApplicationSummaryPage(items=[ApplicationListItem(**app) for app in apps], next_before=next_before)
+
+async def load_application_detail(application_id: str) -> dict:
+    """Parsed application with document metadata only, via the read-through cache"""
+    app = application_cache.get(application_id)
+    if app is None:
+        generation = application_cache.generation
+        app = await find_application(application_id, METADATA_PROJECTION)
+        if not app:
+            raise HTTPException(status_code=404, detail="Application not found")
+        
+        if isinstance(app['created_at'], str):
+            app['created_at'] = datetime.fromisoformat(app['created_at'])
+        if isinstance(app['updated_at'], str):
+            app['updated_at'] = datetime.fromisoformat(app['updated_at'])
+        application_cache.put(application_id, strip_document_blobs(app), generation)
+    return app
+
 @api_router.get("/applications/{application_id}")
-async def get_application(application_id: str, request: Request, session_token: Optional[str] = Cookie(None)):
+async def get_application(application_id: str, request: Request, response: Response, include: Optional[str] = None, session_token: Optional[str] = Cookie(None)):
     user = await get_current_user(request, session_token)
     
-    app = await db.visa_applications.find_one({"application_id": application_id}, {"_id": 0})
-    if not app:
-        raise HTTPException(status_code=404, detail="Application not found")
+    app = await load_application_detail(application_id)
     
     if app["user_id"] != user.user_id and user.role != "admin":
         raise HTTPException(status_code=403, detail="Access denied")
     
-    if isinstance(app['created_at'], str):
-        app['created_at'] = datetime.fromisoformat(app['created_at'])
-    if isinstance(app['updated_at'], str):
-        app['updated_at'] = datetime.fromisoformat(app['updated_at'])
+    include_documents = include == "documents"
+    etag = application_etag(app, "documents") if include_documents else application_etag(app)
+    if is_not_modified(request, etag, app['updated_at']):
+        return not_modified_response(etag, app['updated_at'])
+    set_validators(response, etag, app['updated_at'])
+    
+    if include_documents:
+        # Backwards-compatible inline bytes: read documents uncached, then hashed blobs
+        full_app = await find_application(application_id, {"_id": 0, "documents": 1})
+        documents = (await load_document_data(full_app))["documents"] if full_app else {}
+        return VisaApplicationWithDocuments(**{**app, "documents": documents})
     
     return VisaApplication(**app)
 
+@api_router.get("/applications/{application_id}/documents/{doc_type}")
+async def get_document(application_id: str, doc_type: str, request: Request, session_token: Optional[str] = Cookie(None)):
+    user = await get_current_user(request, session_token)
+    
+    app = await load_application_detail(application_id)
+    
+    if app["user_id"] != user.user_id and user.role != "admin":
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    document = app["documents"].get(doc_type)
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    # Hashed documents are immutable, so the content hash is a strong validator
+    sha256 = document.get("sha256")
+    etag = f'"{sha256}"' if sha256 else application_etag(app, "document", doc_type)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    if sha256:
+        blob = await db.document_blobs.find_one({"_id": sha256}, {"data": 1})
+        content = blob["data"] if blob else None
+    else:
+        # The whole sub-document, so an archived copy keeps its compression marker
+        legacy = await find_application(application_id, {"_id": 0, f"documents.{doc_type}": 1})
+        data = (legacy or {}).get("documents", {}).get(doc_type, {}).get("data")
+        content = base64.b64decode(data) if data else None
+    if content is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    filename = re.sub(r'[^A-Za-z0-9._ -]', '', document.get("filename") or "") or doc_type
+    content_type = (document.get("content_type") or "").split(";")[0].strip().lower()
+    if content_type in INLINE_DOCUMENT_TYPES:
+        disposition = "inline"
+    else:
+        content_type, disposition = "application/octet-stream", "attachment"
+    response = Response(
+        content=content,
+        media_type=content_type,
+        headers={
+            "Content-Disposition": f'{disposition}; filename="{filename}"',
+            "X-Content-Type-Options": "nosniff",
+            "Content-Security-Policy": "default-src 'none'; img-src 'self'; style-src 'unsafe-inline'; sandbox"
+        }
+    )
+    return set_validators(response, etag)
+
 @api_router.put("/applications/{application_id}")
 async def update_application(application_id: str, app_data: ApplicationCreate, request: Request, session_token: Optional[str] = Cookie(None)):
     user = await get_current_user(request, session_token)
@@ -643,17 +1925,20 @@ async def update_application(application_id: str, app_data: ApplicationCreate, r
     if app["user_id"] != user.user_id:
         raise HTTPException(status_code=403, detail="Access denied")
     
-    await db.visa_applications.update_one(
-        {"application_id": application_id},
+    result = await db.visa_applications.update_one(
+        {"application_id": application_id, "status": {"$in": sorted(EDITABLE_STATUSES)}},
         {"$set": {
             "visa_type": app_data.visa_type,
             "personal_info": app_data.personal_info,
             "travel_details": app_data.travel_details,
             "updated_at": datetime.now(timezone.utc).isoformat()
-        }}
+        }, "$inc": {"version": 1}}
     )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=409, detail=f"Cannot edit an application that is {app['status']}")
+    await invalidate_application(application_id)
     
-    updated_app = await db.visa_applications.find_one({"application_id": application_id}, {"_id": 0})
+    updated_app = await db.visa_applications.find_one({"application_id": application_id}, METADATA_PROJECTION)
     if isinstance(updated_app['created_at'], str):
         updated_app['created_at'] = datetime.fromisoformat(updated_app['created_at'])
     if isinstance(updated_app['updated_at'], str):
@@ -661,65 +1946,133 @@ async def update_application(application_id: str, app_data: ApplicationCreate, r
     
     return VisaApplication(**updated_app)
 
-@api_router.post("/applications/{application_id}/documents")
-async def upload_document(application_id: str, file: UploadFile = File(...), doc_type: str = "passport", request: Request = None, session_token: Optional[str] = Cookie(None)):
+def build_patch_update(patch: ApplicationPatch) -> dict:
+    """Flatten a PATCH body into dotted $set paths so untouched fields are left alone"""
+    update_data = {}
+    if patch.visa_type is not None:
+        update_data["visa_type"] = patch.visa_type
+    for section in ("personal_info", "travel_details"):
+        fields = getattr(patch, section)
+        for field, value in (fields or {}).items():
+            if not field or field.startswith("$") or "." in field:
+                raise HTTPException(status_code=400, detail=f"Invalid field name: {field}")
+            update_data[f"{section}.{field}"] = value
+    return update_data
+
+@api_router.patch("/applications/{application_id}")
+async def patch_application(application_id: str, patch: ApplicationPatch, request: Request, session_token: Optional[str] = Cookie(None)):
     user = await get_current_user(request, session_token)
     
-    app = await db.visa_applications.find_one({"application_id": application_id}, {"_id": 0})
-    if not app:
-        raise HTTPException(status_code=404, detail="Application not found")
+    update_data = build_patch_update(patch)
+    if not update_data:
+        raise HTTPException(status_code=400, detail="No changes provided")
+    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    
+    # Documents written before versioning have no counter and count as version 0
+    expected_version = patch.version if patch.version else {"$in": [0, None]}
+    updated_app = await db.visa_applications.find_one_and_update(
+        {"application_id": application_id, "user_id": user.user_id, "version": expected_version,
+         "status": {"$in": sorted(EDITABLE_STATUSES)}},
+        {"$set": update_data, "$inc": {"version": 1}},
+        projection={"_id": 0, "documents": 0},
+        return_document=ReturnDocument.AFTER
+    )
     
-    if app["user_id"] != user.user_id:
-        raise HTTPException(status_code=403, detail="Access denied")
+    if not updated_app:
+        app = await db.visa_applications.find_one(
+            {"application_id": application_id}, {"_id": 0, "user_id": 1, "version": 1, "status": 1}
+        )
+        if not app:
+            raise HTTPException(status_code=404, detail="Application not found")
+        if app["user_id"] != user.user_id:
+            raise HTTPException(status_code=403, detail="Access denied")
+        if app["status"] not in EDITABLE_STATUSES:
+            raise HTTPException(status_code=409, detail=f"Cannot edit an application that is {app['status']}")
+        raise HTTPException(
+            status_code=409,
+            detail=f"Application was modified concurrently (current version {app.get('version', 0)})"
+        )
+    await invalidate_application(application_id)
     
-    content = await file.read()
-    encoded = base64.b64encode(content).decode('utf-8')
+    if isinstance(updated_app['created_at'], str):
+        updated_app['created_at'] = datetime.fromisoformat(updated_app['created_at'])
+    if isinstance(updated_app['updated_at'], str):
+        updated_app['updated_at'] = datetime.fromisoformat(updated_app['updated_at'])
+    
+    return ApplicationSummary(**updated_app)
+
+@api_router.post("/applications/{application_id}/documents")
+async def upload_document(application_id: str, file: UploadFile = File(...), doc_type: str = "passport", request: Request = None, session_token: Optional[str] = Cookie(None)):
+    if not doc_type or doc_type.startswith("$") or "." in doc_type:
+        raise HTTPException(status_code=400, detail=f"Invalid document type: {doc_type}")
+    
+    user = await get_current_user(request, session_token)
+    await enforce_rate_limit("upload", user.user_id)
+    
+    # Identical files (e.g. the same passport on several applications) are stored once
+    sha256, size = await hash_upload(file)
+    await acquire_blob(sha256, file, size)
     
+    now = datetime.now(timezone.utc).isoformat()
     document_data = {
         "filename": file.filename,
         "content_type": file.content_type,
-        "data": encoded
+        "sha256": sha256,
+        "size": size,
+        "uploaded_at": now
     }
     
-    await db.visa_applications.update_one(
-        {"application_id": application_id},
+    previous = await db.visa_applications.find_one_and_update(
+        {"application_id": application_id, "user_id": user.user_id},
         {"$set": {
             f"documents.{doc_type}": document_data,
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }}
+            "updated_at": now
+        }, "$inc": {"version": 1}},
+        projection={"_id": 0, f"documents.{doc_type}.sha256": 1}
     )
     
+    if previous is None:
+        await release_blob(sha256)
+        app = await db.visa_applications.find_one({"application_id": application_id}, {"_id": 0, "user_id": 1})
+        if not app:
+            raise HTTPException(status_code=404, detail="Application not found")
+        raise HTTPException(status_code=403, detail="Access denied")
+    
+    replaced_sha256 = previous.get("documents", {}).get(doc_type, {}).get("sha256")
+    if replaced_sha256:
+        await release_blob(replaced_sha256)
+    await invalidate_application(application_id)
+    
     return {"message": "Document uploaded successfully", "doc_type": doc_type}
 
 @api_router.post("/applications/{application_id}/submit")
 async def submit_application(application_id: str, request: Request, session_token: Optional[str] = Cookie(None)):
     user = await get_current_user(request, session_token)
     
-    app = await db.visa_applications.find_one({"application_id": application_id}, {"_id": 0})
-    if not app:
-        raise HTTPException(status_code=404, detail="Application not found")
-    
-    if app["user_id"] != user.user_id:
-        raise HTTPException(status_code=403, detail="Access denied")
-    
-    await db.visa_applications.update_one(
-        {"application_id": application_id},
-        {"$set": {
-            "status": "submitted",
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }}
-    )
+    await transition_application(application_id, "submitted", owner_id=user.user_id)
     
     return {"message": "Application submitted successfully"}
 
 @api_router.get("/admin/applications")
-async def get_all_applications(request: Request, session_token: Optional[str] = Cookie(None)):
+async def get_all_applications(request: Request, response: Response, status: Optional[str] = None, visa_type: Optional[str] = None,
+                               include_archived: bool = True, session_token: Optional[str] = Cookie(None)):
+    """Applications matching the filters; include_archived=false skips decisions moved to the archive"""
     user = await get_current_user(request, session_token)
     
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    apps = await db.visa_applications.find({}, {"_id": 0}).to_list(1000)
+    query = admin_application_filter(status, visa_type)
+    scope = f"admin:{status}:{visa_type}:{include_archived}"
+    
+    # Validators come from the whole match, not the rows below, which are capped at 1000
+    count, last_modified = await application_list_validators(query, include_archived)
+    etag = application_list_etag(scope, count, last_modified)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    
+    apps = await find_applications(query, METADATA_PROJECTION, 1000, include_archived)
+    set_validators(response, etag)
     
     for app in apps:
         if isinstance(app['created_at'], str):
@@ -729,44 +2082,121 @@ async def get_all_applications(request: Request, session_token: Optional[str] =
     
     return [VisaApplication(**app) for app in apps]
 
-@api_router.put("/admin/applications/{application_id}/status")
-async def update_application_status(application_id: str, status_data: StatusUpdate, request: Request, session_token: Optional[str] = Cookie(None)):
+@api_router.get("/admin/applications/export")
+async def export_applications(request: Request, format: str = "csv", status: Optional[str] = None, visa_type: Optional[str] = None,
+                              created_from: Optional[datetime] = None, created_to: Optional[datetime] = None,
+                              include_archived: bool = True, session_token: Optional[str] = Cookie(None)):
+    """Stream matching applications as CSV or NDJSON; include_archived=false skips archived decisions"""
     user = await get_current_user(request, session_token)
     
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     
-    app = await db.visa_applications.find_one({"application_id": application_id}, {"_id": 0})
-    if not app:
-        raise HTTPException(status_code=404, detail="Application not found")
-    
-    update_data = {
-        "status": status_data.status,
-        "updated_at": datetime.now(timezone.utc).isoformat()
-    }
-    
-    if status_data.notes:
-        update_data["admin_notes"] = status_data.notes
+    query = admin_application_filter(status, visa_type, created_from, created_to)
+    filename = f"applications_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}"
     
-    result = await db.visa_applications.update_one(
-        {"application_id": application_id},
-        {"$set": update_data}
-    )
+    if format == "csv":
+        return StreamingResponse(
+            stream_csv(query, include_archived),
+            media_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.csv"'}
+        )
+    if format == "ndjson":
+        return StreamingResponse(
+            stream_ndjson(query, include_archived),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson"'}
+        )
+    raise HTTPException(status_code=400, detail="format must be csv or ndjson")
+
+@api_router.put("/admin/applications/{application_id}/status")
+async def update_application_status(application_id: str, status_data: StatusUpdate, request: Request, session_token: Optional[str] = Cookie(None)):
+    user = await get_current_user(request, session_token)
     
-    if result.matched_count == 0:
-        raise HTTPException(status_code=404, detail="Application not found")
+    if user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    await enforce_rate_limit("status", user.user_id)
     
-    updated_app = await db.visa_applications.find_one({"application_id": application_id}, {"_id": 0})
+    extra_fields = {"admin_notes": status_data.notes} if status_data.notes else None
+    updated_app = await transition_application(application_id, status_data.status, extra_fields=extra_fields)
     
+    # Only the request that won the transition gets here, so each decision emails once
     if status_data.status == "approved":
-        asyncio.create_task(send_approval_email(updated_app))
+        send_in_background(send_approval_email(updated_app))
     elif status_data.status == "rejected":
-        asyncio.create_task(send_rejection_email(updated_app, status_data.notes or ""))
+        send_in_background(send_rejection_email(updated_app, status_data.notes or ""))
+    if status_data.status in DECIDED_STATUSES:
+        queue_admin_notification(updated_app, status_data.notes or "")
     
     return {"message": "Status updated successfully", "email_sent": status_data.status in ["approved", "rejected"]}
 
+@api_router.put("/admin/users/{user_id}/role")
+async def update_user_role(user_id: str, role_data: RoleUpdate, request: Request, session_token: Optional[str] = Cookie(None)):
+    user = await get_current_user(request, session_token)
+    
+    if user.role != "admin":
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    if role_data.role not in ("user", "admin"):
+        raise HTTPException(status_code=400, detail="Role must be user or admin")
+    
+    result = await db.users.update_one({"user_id": user_id}, {"$set": {"role": role_data.role}})
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    await invalidate_admin_emails()
+    # Cached sessions carry the user's role
+    for token in await user_session_tokens(user_id):
+        await session_cache.delete(token)
+    
+    return {"message": "Role updated successfully"}
+
+@api_router.get("/health/live")
+async def health_live():
+    """The process is up and serving; never touches the database"""
+    return {"status": "ok"}
+
+@api_router.get("/health/ready")
+async def health_ready():
+    """Ready when Mongo answers a ping in time; includes pool checkout waits for the load balancer"""
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(db.command("ping"), timeout=HEALTH_PING_TIMEOUT_SECONDS)
+        status_code, status = 200, "ready"
+    except Exception as e:
+        logger.warning("Readiness check failed: %s", e)
+        status_code, status = 503, "unavailable"
+    return JSONResponse(status_code=status_code, content={
+        "status": status,
+        "db_ping_ms": round((time.perf_counter() - started) * 1000, 2),
+        "pool": pool_monitor.stats(),
+        "caches": {namespace: cache.stats() for namespace, cache in caches.items()}
+    })
+
 app.include_router(api_router)
 
+class JSONGZipResponder(GZipResponder):
+    async def send_with_gzip(self, message):
+        if message["type"] == "http.response.start":
+            content_type = Headers(raw=message["headers"]).get("content-type", "")
+            # GZipResponder passes already-encoded responses through untouched; treat
+            # everything but JSON that way so documents keep their bytes and strong ETags
+            if not content_type.startswith("application/json"):
+                self.content_encoding_set = True
+                self.initial_message = message
+                return
+        await super().send_with_gzip(message)
+
+class JSONGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware restricted to application/json responses"""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            await JSONGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+app.add_middleware(JSONGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -775,12 +2205,107 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
-logger = logging.getLogger(__name__)
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+@app.middleware("http")
+async def log_requests(request: Request, call_next):
+    """Tag the request with an id (the caller's X-Request-ID when sane) and log one access line"""
+    request_id = request.headers.get('X-Request-ID', '')
+    if not REQUEST_ID_PATTERN.match(request_id):
+        request_id = uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers['X-Request-ID'] = request_id
+    logger.info(
+        "%s %s %s", request.method, request.url.path, response.status_code,
+        extra={
+            "request_id": request_id,
+            "application_id": request.path_params.get("application_id"),
+            "method": request.method,
+            "path": request.url.path,
+            "status": response.status_code,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "sampled": True
+        }
+    )
+    return response
+
+@app.on_event("startup")
+async def connect_to_mongo():
+    # Registered first: every later startup hook and request handler uses db
+    global client, db
+    client = mongo_client_factory(
+        os.environ['MONGO_URL'],
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        event_listeners=[pool_monitor]
+    )
+    db = client[os.environ['DB_NAME']]
+    # Concurrent pings each need their own connection, so this opens the minimum pool now
+    try:
+        await asyncio.gather(*(db.command("ping") for _ in range(max(MONGO_MIN_POOL_SIZE, 1))))
+    except Exception as e:
+        logger.warning("Could not pre-warm the Mongo connection pool: %s", e)
+
+@app.on_event("startup")
+async def create_indexes():
+    # Applicant dashboard: one user's applications, newest first; application_id breaks created_at ties
+    await db.visa_applications.create_index([("user_id", 1), ("created_at", -1), ("application_id", -1)])
+    # List ETags: newest updated_at of the admin list and of one applicant's list
+    await db.visa_applications.create_index([("updated_at", -1)])
+    await db.visa_applications.create_index([("user_id", 1), ("updated_at", -1)])
+    # Session lookup on every request; per-user cap and "log out everywhere"
+    await db.user_sessions.create_index("session_token")
+    await db.user_sessions.create_index([("user_id", 1), ("last_seen", -1)])
+    if RATE_LIMIT_BACKEND == "mongo":
+        await db.rate_limits.create_index("expires_at", expireAfterSeconds=0)
+    if CACHE_BACKEND == "mongo":
+        await db.cache_entries.create_index("expires_at", expireAfterSeconds=0)
+
+@app.on_event("startup")
+async def start_cache_invalidation_listener():
+    if APPLICATION_CACHE_PUBSUB:
+        app.state.invalidation_listener = asyncio.create_task(listen_for_invalidations())
+
+@app.on_event("startup")
+async def start_blob_collector():
+    if BLOB_GC_INTERVAL_SECONDS > 0:
+        app.state.blob_collector = asyncio.create_task(run_blob_collector())
+
+@app.on_event("startup")
+async def start_admin_notifier():
+    if ADMIN_NOTIFICATION_FLUSH_SECONDS > 0:
+        app.state.admin_notifier = asyncio.create_task(run_admin_notifier())
+
+@app.on_event("startup")
+async def start_archiver():
+    if ARCHIVE_ENABLED:
+        await db.visa_applications_archive.create_index("application_id", unique=True)
+        # Archived applications stay on the applicant's dashboard
+        await db.visa_applications_archive.create_index([("user_id", 1), ("created_at", -1), ("application_id", -1)])
+        await db.visa_applications_archive.create_index([("updated_at", -1)])
+        await db.visa_applications_archive.create_index([("user_id", 1), ("updated_at", -1)])
+        app.state.archiver = asyncio.create_task(run_archiver())
+
+@app.on_event("startup")
+async def start_warm_up():
+    if WARM_UP_IMPORTS:
+        app.state.warm_up = asyncio.create_task(asyncio.to_thread(warm_up_optional_modules))
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    for task_name in ("invalidation_listener", "archiver", "blob_collector", "admin_notifier", "warm_up"):
+        task = getattr(app.state, task_name, None)
+        if task:
+            task.cancel()
+    # Do not drop decisions that were waiting for the next batch
+    await flush_admin_notifications()
+    client.close()
+    stop_logging()
\ No newline at end of file
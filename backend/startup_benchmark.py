@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Measure cold-start cost of the API: module import, app startup and first request.
+
+Each run is a fresh interpreter, like a new uvicorn worker. Needs MONGO_URL/DB_NAME
+(or backend/.env) because the startup hooks connect to Mongo.
+
+    python backend/startup_benchmark.py --runs 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import server
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(server.app) as client:
+    ready = time.perf_counter()
+    client.get("/api/auth/me")
+    answered = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "first_request_ms": (answered - ready) * 1000,
+}))
+"""
+
+
+def measure_once() -> dict:
+    result = subprocess.run([sys.executable, "-c", PROBE], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [measure_once() for _ in range(args.runs)]
+    report = {}
+    for metric in ("import_ms", "startup_ms", "first_request_ms"):
+        samples = sorted(run[metric] for run in runs)
+        report[metric] = {
+            "median": round(statistics.median(samples), 1),
+            "max": round(samples[-1], 1),
+        }
+    print(json.dumps({"runs": args.runs, **report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -34,13 +34,20 @@ const Dashboard = () => {
 
   const fetchApplications = async () => {
     try {
-      const response = await fetch(`${BACKEND_URL}/api/applications`, {
-        credentials: 'include'
-      });
-      if (response.ok) {
+      // The summary view is paged; follow next_before so the stats cover every application
+      const items = [];
+      let before = null;
+      do {
+        const cursor = before ? `&before=${encodeURIComponent(before)}` : '';
+        const response = await fetch(`${BACKEND_URL}/api/applications?view=summary&limit=200${cursor}`, {
+          credentials: 'include'
+        });
+        if (!response.ok) break;
         const data = await response.json();
-        setApplications(data);
-      }
+        items.push(...data.items);
+        before = data.next_before;
+      } while (before);
+      setApplications(items);
     } catch (error) {
       console.error('Error fetching applications:', error);
       toast.error('Failed to load applications');
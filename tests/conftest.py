@@ -0,0 +1,267 @@
+import os
+import sys
+import uuid
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Never point the suite at a real application database; it is dropped between tests.
+os.environ["DB_NAME"] = os.environ.get("TEST_DB_NAME", "meowls_visa_test")
+# Without MONGO_URL the suite runs against the in-memory fake in tests/fake_mongo.py;
+# set it to run the same tests against a real MongoDB.
+USE_FAKE_MONGO = "MONGO_URL" not in os.environ
+if USE_FAKE_MONGO:
+    os.environ["MONGO_URL"] = "mongodb://in-memory"
+# Background maintenance loops would race the assertions; tests call them directly.
+os.environ.setdefault("BLOB_GC_INTERVAL_SECONDS", "0")
+os.environ.setdefault("ADMIN_NOTIFICATION_FLUSH_SECONDS", "0")
+
+
+# Motor methods that always cost exactly one trip to the server.
+ROUND_TRIP_METHODS = {
+    "find_one",
+    "insert_one",
+    "insert_many",
+    "update_one",
+    "update_many",
+    "replace_one",
+    "delete_one",
+    "delete_many",
+    "find_one_and_update",
+    "find_one_and_replace",
+    "find_one_and_delete",
+    "count_documents",
+    "estimated_document_count",
+    "distinct",
+    "bulk_write",
+    "create_index",
+    "create_indexes",
+}
+
+# Cursor builders that only change the query; they return the cursor itself.
+CURSOR_BUILDERS = {"sort", "skip", "limit", "batch_size", "max_time_ms", "hint"}
+
+
+class RoundTripCounter:
+    """Records every database round trip made through a CountingDatabase"""
+
+    def __init__(self):
+        self.calls = []
+
+    @property
+    def count(self) -> int:
+        return len(self.calls)
+
+    def record(self, collection: str, operation: str):
+        self.calls.append(f"{collection}.{operation}")
+
+    def reset(self):
+        self.calls = []
+
+
+class CountingCursor:
+    """Wraps a Motor cursor; each to_list() call or iteration batch is one round trip"""
+
+    def __init__(self, cursor, counter: RoundTripCounter, collection: str, operation: str):
+        self._cursor = cursor
+        self._counter = counter
+        self._collection = collection
+        self._operation = operation
+        self._iterating = False
+
+    def __getattr__(self, name):
+        attr = getattr(self._cursor, name)
+        if name in CURSOR_BUILDERS:
+            def builder(*args, **kwargs):
+                attr(*args, **kwargs)
+                return self
+            return builder
+        return attr
+
+    async def to_list(self, length=None):
+        self._counter.record(self._collection, f"{self._operation}.to_list")
+        return await self._cursor.to_list(length)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._iterating:
+            self._iterating = True
+            self._counter.record(self._collection, f"{self._operation}.iter")
+        return await self._cursor.__anext__()
+
+
+class CountingCollection:
+    def __init__(self, collection, counter: RoundTripCounter, name: str):
+        self._collection = collection
+        self._counter = counter
+        self._name = name
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name in ("find", "aggregate"):
+            def cursor_factory(*args, **kwargs):
+                return CountingCursor(attr(*args, **kwargs), self._counter, self._name, name)
+            return cursor_factory
+        if name in ROUND_TRIP_METHODS:
+            async def operation(*args, **kwargs):
+                self._counter.record(self._name, name)
+                return await attr(*args, **kwargs)
+            return operation
+        return attr
+
+
+class CountingDatabase:
+    """Drop-in replacement for server.db that counts round trips per collection call"""
+
+    def __init__(self, database, counter: RoundTripCounter):
+        self._database = database
+        self._counter = counter
+
+    def __getattr__(self, name):
+        return CountingCollection(getattr(self._database, name), self._counter, name)
+
+    def __getitem__(self, name):
+        return CountingCollection(self._database[name], self._counter, name)
+
+    async def command(self, *args, **kwargs):
+        self._counter.record("$cmd", str(args[0]) if args else "command")
+        return await self._database.command(*args, **kwargs)
+
+
+@pytest.fixture(scope="session")
+def server():
+    import server as server_module
+    if USE_FAKE_MONGO:
+        from .fake_mongo import FakeMongoClient
+        server_module.mongo_client_factory = FakeMongoClient
+    # Decisions email the admins as they happen; never let that reach the real provider
+    server_module.send_email = lambda params: {"id": "test"}
+    return server_module
+
+
+@pytest.fixture(scope="session")
+def api(server):
+    from fastapi.testclient import TestClient
+
+    with TestClient(server.app) as client:
+        yield client
+
+
+@pytest.fixture
+def run(api):
+    """Run a coroutine on the app's event loop (Motor clients are bound to one loop)"""
+    def runner(coro_fn, *args, **kwargs):
+        return api.portal.call(lambda: coro_fn(*args, **kwargs))
+    return runner
+
+
+@pytest.fixture(autouse=True)
+def clean_db(request):
+    if "api" not in request.fixturenames:
+        yield
+        return
+    server_module = request.getfixturevalue("server")
+    api_client = request.getfixturevalue("api")
+    api_client.portal.call(server_module.client.drop_database, os.environ["DB_NAME"])
+    server_module.application_cache.clear()
+    api_client.portal.call(server_module.clear_caches)
+    server_module.admin_notification_queue.clear()
+    server_module.rate_limiter.clear()
+    yield
+
+
+@pytest.fixture
+def round_trips(server, monkeypatch):
+    counter = RoundTripCounter()
+    monkeypatch.setattr(server, "db", CountingDatabase(server.db, counter))
+    return counter
+
+
+@pytest.fixture(scope="session")
+def password_hash(server):
+    # bcrypt is deliberately slow; hash the shared test password once
+    return server.hash_password("password123")
+
+
+@pytest.fixture
+def make_user(server, run, password_hash):
+    """Insert a user with a live session and return (user_id, auth headers)"""
+    def factory(role: str = "user", email: str = None):
+        user_id = f"user_{uuid.uuid4().hex[:12]}"
+        token = f"session_{uuid.uuid4().hex}"
+        now = datetime.now(timezone.utc)
+        run(server.db.users.insert_one, {
+            "user_id": user_id,
+            "email": email or f"{user_id}@example.com",
+            "password_hash": password_hash,
+            "name": "Test User",
+            "picture": None,
+            "role": role,
+            "created_at": now.isoformat()
+        })
+        run(server.db.user_sessions.insert_one, {
+            "user_id": user_id,
+            "session_token": token,
+            "expires_at": (now + timedelta(days=7)).isoformat(),
+            "created_at": now.isoformat()
+        })
+        return user_id, {"Authorization": f"Bearer {token}"}
+    return factory
+
+
+@pytest.fixture
+def make_application(server, run):
+    def factory(user_id: str, status: str = "draft", **fields):
+        now = datetime.now(timezone.utc).isoformat()
+        application = {
+            "application_id": f"app_{uuid.uuid4().hex[:12]}",
+            "user_id": user_id,
+            "visa_type": "tourist",
+            "status": status,
+            "personal_info": {
+                "full_name": "Test Applicant",
+                "email": "applicant@example.com",
+                "nationality": "Felinia",
+                "passport_number": "P1234567"
+            },
+            "travel_details": {
+                "purpose": "Tourism",
+                "arrival_date": "2026-12-01",
+                "departure_date": "2026-12-15"
+            },
+            "documents": {},
+            "created_at": now,
+            "updated_at": now
+        }
+        application.update(fields)
+        run(server.db.visa_applications.insert_one, dict(application))
+        return application
+    return factory
+
+
+@pytest.fixture
+def upload(api):
+    """POST a document to an application and return the response"""
+    def post(headers, application_id: str, content: bytes = b"passport-scan", doc_type: str = "passport",
+             content_type: str = "image/jpeg", filename: str = None):
+        return api.post(
+            f"/api/applications/{application_id}/documents",
+            params={"doc_type": doc_type},
+            files={"file": (filename or f"{doc_type}.jpg", content, content_type)},
+            headers=headers
+        )
+    return post
+
+
+@pytest.fixture
+def login(api):
+    """POST credentials (make_user's password by default) and return the response"""
+    def post(email: str, password: str = "password123"):
+        return api.post("/api/auth/login", json={"email": email, "password": password})
+    return post
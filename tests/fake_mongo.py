@@ -0,0 +1,620 @@
+"""In-memory stand-in for the parts of Motor that server.py uses.
+
+Supports the query operators, projections, update operators and cursor
+methods the backend relies on, so endpoint tests can run without MongoDB.
+It is deliberately small: anything unsupported raises NotImplementedError
+instead of silently returning wrong results.
+"""
+import copy
+import re
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import DeleteMany, DeleteOne, InsertOne, ReplaceOne, ReturnDocument, UpdateMany, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from pymongo.results import BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult, UpdateResult
+
+_MISSING = object()
+
+
+def _get_path(document, path: str):
+    value = document
+    for part in path.split("."):
+        if isinstance(value, dict) and part in value:
+            value = value[part]
+        elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+            value = value[int(part)]
+        else:
+            return _MISSING
+    return value
+
+
+def _set_path(document, path: str, value):
+    parts = path.split(".")
+    target = document
+    for part in parts[:-1]:
+        if not isinstance(target.get(part), dict):
+            target[part] = {}
+        target = target[part]
+    target[parts[-1]] = value
+
+
+def _unset_path(document, path: str):
+    parts = path.split(".")
+    target = document
+    for part in parts[:-1]:
+        target = target.get(part)
+        if not isinstance(target, dict):
+            return
+    target.pop(parts[-1], None)
+
+
+def _sort_key(value):
+    """Order values roughly like MongoDB's BSON comparison order"""
+    if value is _MISSING or value is None:
+        return (0, 0)
+    if isinstance(value, bool):
+        return (5, value)
+    if isinstance(value, (int, float)):
+        return (1, value)
+    if isinstance(value, str):
+        return (2, value)
+    if isinstance(value, dict):
+        return (3, str(sorted(value.items())))
+    if isinstance(value, list):
+        return (4, str(value))
+    if isinstance(value, ObjectId):
+        return (6, str(value))
+    if isinstance(value, datetime):
+        return (7, value.timestamp() if value.tzinfo else value.isoformat())
+    return (8, str(value))
+
+
+def _compare(value, operand, op):
+    if value is _MISSING or value is None or operand is None:
+        return False
+    try:
+        return op(value, operand)
+    except TypeError:
+        return False
+
+
+def _match_operator(value, operator: str, operand) -> bool:
+    candidates = value if isinstance(value, list) else [value]
+    if operator == "$eq":
+        return _match_value(value, operand)
+    if operator == "$ne":
+        return not _match_value(value, operand)
+    if operator == "$gt":
+        return any(_compare(v, operand, lambda a, b: a > b) for v in candidates)
+    if operator == "$gte":
+        return any(_compare(v, operand, lambda a, b: a >= b) for v in candidates)
+    if operator == "$lt":
+        return any(_compare(v, operand, lambda a, b: a < b) for v in candidates)
+    if operator == "$lte":
+        return any(_compare(v, operand, lambda a, b: a <= b) for v in candidates)
+    if operator == "$in":
+        return any(_match_value(value, item) for item in operand)
+    if operator == "$nin":
+        return not any(_match_value(value, item) for item in operand)
+    if operator == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if operator == "$regex":
+        return any(isinstance(v, str) and operand.search(v) for v in candidates)
+    if operator == "$not":
+        return not _match_condition(value, operand)
+    raise NotImplementedError(f"fake_mongo does not support query operator {operator}")
+
+
+def _match_value(value, expected) -> bool:
+    if isinstance(value, list) and not isinstance(expected, list):
+        return any(item == expected for item in value)
+    if value is _MISSING:
+        return expected is None
+    return value == expected
+
+
+def _match_condition(value, condition) -> bool:
+    if isinstance(condition, dict) and condition and all(key.startswith("$") for key in condition):
+        condition = dict(condition)
+        if "$regex" in condition:
+            pattern = condition.pop("$regex")
+            flags = re.IGNORECASE if "i" in condition.pop("$options", "") else 0
+            condition["$regex"] = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+        return all(_match_operator(value, op, operand) for op, operand in condition.items())
+    if isinstance(condition, re.Pattern):
+        return _match_operator(value, "$regex", condition)
+    return _match_value(value, condition)
+
+
+def matches(document: dict, query: dict) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$and":
+            if not all(matches(document, sub) for sub in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(document, sub) for sub in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(document, sub) for sub in condition):
+                return False
+        elif key.startswith("$"):
+            raise NotImplementedError(f"fake_mongo does not support top-level operator {key}")
+        elif not _match_condition(_get_path(document, key), condition):
+            return False
+    return True
+
+
+def project(document: dict, projection) -> dict:
+    document = copy.deepcopy(document)
+    if not projection:
+        return document
+    if isinstance(projection, (list, tuple)):
+        projection = {field: 1 for field in projection}
+    include_id = bool(projection.get("_id", 1))
+    fields = {key: value for key, value in projection.items() if key != "_id"}
+    if fields and all(value for value in fields.values()):
+        result = {}
+        for path in fields:
+            value = _get_path(document, path)
+            if value is not _MISSING:
+                _set_path(result, path, value)
+        if include_id and "_id" in document:
+            result["_id"] = document["_id"]
+        return result
+    if any(value for value in fields.values()):
+        raise NotImplementedError("fake_mongo cannot mix inclusion and exclusion projections")
+    for path in fields:
+        _unset_path(document, path)
+    if not include_id:
+        document.pop("_id", None)
+    return document
+
+
+def _apply_update(document: dict, update: dict, inserting: bool = False):
+    if not update or not all(key.startswith("$") for key in update):
+        raise NotImplementedError("fake_mongo only supports operator updates")
+    for operator, fields in update.items():
+        for path, operand in fields.items():
+            current = _get_path(document, path)
+            if operator == "$set":
+                _set_path(document, path, copy.deepcopy(operand))
+            elif operator == "$setOnInsert":
+                if inserting:
+                    _set_path(document, path, copy.deepcopy(operand))
+            elif operator == "$unset":
+                _unset_path(document, path)
+            elif operator == "$inc":
+                _set_path(document, path, (0 if current is _MISSING else current) + operand)
+            elif operator == "$max":
+                if current is _MISSING or _sort_key(operand) > _sort_key(current):
+                    _set_path(document, path, copy.deepcopy(operand))
+            elif operator == "$min":
+                if current is _MISSING or _sort_key(operand) < _sort_key(current):
+                    _set_path(document, path, copy.deepcopy(operand))
+            elif operator == "$push":
+                items = operand["$each"] if isinstance(operand, dict) and "$each" in operand else [operand]
+                _set_path(document, path, (current if current is not _MISSING else []) + copy.deepcopy(items))
+            elif operator == "$addToSet":
+                items = operand["$each"] if isinstance(operand, dict) and "$each" in operand else [operand]
+                values = list(current) if current is not _MISSING else []
+                values.extend(item for item in copy.deepcopy(items) if item not in values)
+                _set_path(document, path, values)
+            elif operator == "$pull":
+                if current is not _MISSING:
+                    _set_path(document, path, [item for item in current if not _match_condition(item, operand)])
+            else:
+                raise NotImplementedError(f"fake_mongo does not support update operator {operator}")
+
+
+def _upsert_seed(query: dict) -> dict:
+    seed = {}
+    for key, condition in (query or {}).items():
+        if key.startswith("$"):
+            continue
+        if isinstance(condition, dict) and any(k.startswith("$") for k in condition):
+            if "$eq" in condition:
+                _set_path(seed, key, copy.deepcopy(condition["$eq"]))
+            continue
+        _set_path(seed, key, copy.deepcopy(condition))
+    return seed
+
+
+def _normalize_sort(key_or_list, direction=None):
+    if key_or_list is None:
+        return []
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    return list(key_or_list)
+
+
+def _sorted(documents, sort_spec):
+    for key, direction in reversed(sort_spec):
+        documents = sorted(documents, key=lambda doc: _sort_key(_get_path(doc, key)), reverse=direction < 0)
+    return documents
+
+
+class FakeCursor:
+    def __init__(self, collection: "FakeCollection", query=None, projection=None, sort=None, skip=0, limit=0, **kwargs):
+        self._collection = collection
+        self._query = query or {}
+        self._projection = projection
+        self._sort = _normalize_sort(sort)
+        self._skip = skip
+        self._limit = limit
+        self._results = None
+
+    def sort(self, key_or_list, direction=None):
+        self._sort = _normalize_sort(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int):
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int):
+        self._limit = limit
+        return self
+
+    def batch_size(self, batch_size: int):
+        return self
+
+    def max_time_ms(self, max_time_ms):
+        return self
+
+    def hint(self, index):
+        return self
+
+    def _materialize(self):
+        if self._results is None:
+            documents = [doc for doc in self._collection._documents if matches(doc, self._query)]
+            documents = _sorted(documents, self._sort)
+            documents = documents[self._skip:]
+            if self._limit:
+                documents = documents[:self._limit]
+            self._results = [project(doc, self._projection) for doc in documents]
+        return self._results
+
+    async def to_list(self, length=None):
+        results = self._materialize()
+        if length is None:
+            batch, self._results = results, []
+        else:
+            batch, self._results = results[:length], results[length:]
+        return batch
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        results = self._materialize()
+        if not results:
+            raise StopAsyncIteration
+        return results.pop(0)
+
+    async def close(self):
+        self._results = []
+
+
+def _evaluate(document, expression):
+    if isinstance(expression, str) and expression.startswith("$"):
+        value = _get_path(document, expression[1:])
+        return None if value is _MISSING else value
+    return expression
+
+
+def _group(documents, spec):
+    groups = {}
+    for document in documents:
+        key = _evaluate(document, spec["_id"])
+        group_key = repr(key)
+        if group_key not in groups:
+            groups[group_key] = {"_id": key}
+        group = groups[group_key]
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            (operator, expression), = accumulator.items()
+            value = _evaluate(document, expression)
+            if operator == "$sum":
+                group[field] = group.get(field, 0) + (value if isinstance(value, (int, float)) else 0)
+            elif operator in ("$max", "$min"):
+                if value is None:
+                    group.setdefault(field, None)
+                    continue
+                current = group.get(field)
+                better = _sort_key(value) > _sort_key(current) if operator == "$max" else _sort_key(value) < _sort_key(current)
+                if current is None or better:
+                    group[field] = value
+            elif operator == "$first":
+                group.setdefault(field, value)
+            elif operator == "$push":
+                group.setdefault(field, []).append(value)
+            else:
+                raise NotImplementedError(f"fake_mongo does not support accumulator {operator}")
+    return list(groups.values())
+
+
+def aggregate_documents(documents, pipeline):
+    documents = [copy.deepcopy(doc) for doc in documents]
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == "$match":
+            documents = [doc for doc in documents if matches(doc, spec)]
+        elif name == "$group":
+            documents = _group(documents, spec)
+        elif name == "$sort":
+            documents = _sorted(documents, list(spec.items()))
+        elif name == "$skip":
+            documents = documents[spec:]
+        elif name == "$limit":
+            documents = documents[:spec]
+        elif name == "$project":
+            documents = [project(doc, spec) for doc in documents]
+        elif name == "$count":
+            documents = [{spec: len(documents)}] if documents else []
+        else:
+            raise NotImplementedError(f"fake_mongo does not support pipeline stage {name}")
+    return documents
+
+
+class FakeAggregationCursor:
+    def __init__(self, results):
+        self._results = results
+
+    async def to_list(self, length=None):
+        if length is None:
+            batch, self._results = self._results, []
+        else:
+            batch, self._results = self._results[:length], self._results[length:]
+        return batch
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._results:
+            raise StopAsyncIteration
+        return self._results.pop(0)
+
+
+class FakeCollection:
+    def __init__(self, database: "FakeDatabase", name: str):
+        self.database = database
+        self.name = name
+        self._documents = []
+        self._unique_indexes = [["_id"]]
+
+    def _check_unique(self, document, ignore=None):
+        for keys in self._unique_indexes:
+            values = [_get_path(document, key) for key in keys]
+            for other in self._documents:
+                if other is ignore:
+                    continue
+                if [_get_path(other, key) for key in keys] == values:
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name}")
+
+    def _first(self, query, sort=None):
+        documents = [doc for doc in self._documents if matches(doc, query)]
+        documents = _sorted(documents, _normalize_sort(sort))
+        return documents[0] if documents else None
+
+    async def find_one(self, filter=None, projection=None, *args, sort=None, **kwargs):
+        document = self._first(filter, sort)
+        return project(document, projection) if document is not None else None
+
+    def find(self, filter=None, projection=None, *args, **kwargs):
+        return FakeCursor(self, filter, projection, **kwargs)
+
+    def aggregate(self, pipeline, *args, **kwargs):
+        return FakeAggregationCursor(aggregate_documents(self._documents, pipeline))
+
+    async def insert_one(self, document: dict, *args, **kwargs):
+        document.setdefault("_id", ObjectId())
+        stored = copy.deepcopy(document)
+        self._check_unique(stored)
+        self._documents.append(stored)
+        return InsertOneResult(document["_id"], True)
+
+    async def insert_many(self, documents, *args, **kwargs):
+        ids = []
+        for document in documents:
+            result = await self.insert_one(document)
+            ids.append(result.inserted_id)
+        return InsertManyResult(ids, True)
+
+    def _update(self, filter, update, upsert=False, many=False):
+        matched = [doc for doc in self._documents if matches(doc, filter)]
+        if not many:
+            matched = matched[:1]
+        for document in matched:
+            updated = copy.deepcopy(document)
+            _apply_update(updated, update)
+            self._check_unique(updated, ignore=document)
+            document.clear()
+            document.update(updated)
+        raw = {"n": len(matched), "nModified": len(matched), "ok": 1.0}
+        if not matched and upsert:
+            document = _upsert_seed(filter)
+            _apply_update(document, update, inserting=True)
+            document.setdefault("_id", ObjectId())
+            self._check_unique(document)
+            self._documents.append(document)
+            raw.update({"n": 1, "nModified": 0, "upserted": document["_id"]})
+        return raw
+
+    async def update_one(self, filter, update, upsert=False, *args, **kwargs):
+        return UpdateResult(self._update(filter, update, upsert), True)
+
+    async def update_many(self, filter, update, upsert=False, *args, **kwargs):
+        return UpdateResult(self._update(filter, update, upsert, many=True), True)
+
+    async def replace_one(self, filter, replacement, upsert=False, *args, **kwargs):
+        document = self._first(filter)
+        if document is not None:
+            replacement = copy.deepcopy(replacement)
+            replacement["_id"] = document["_id"]
+            document.clear()
+            document.update(replacement)
+            return UpdateResult({"n": 1, "nModified": 1, "ok": 1.0}, True)
+        if upsert:
+            # Like MongoDB, a replacement without _id takes it from an equality match in the filter
+            seed = {key: value for key, value in _upsert_seed(filter).items() if key == "_id"}
+            result = await self.insert_one({**seed, **copy.deepcopy(replacement)})
+            return UpdateResult({"n": 1, "nModified": 0, "upserted": result.inserted_id, "ok": 1.0}, True)
+        return UpdateResult({"n": 0, "nModified": 0, "ok": 1.0}, True)
+
+    async def bulk_write(self, requests, *args, **kwargs):
+        counts = {"nInserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "nUpserted": 0, "upserted": []}
+        for index, operation in enumerate(requests):
+            if isinstance(operation, InsertOne):
+                await self.insert_one(operation._doc)
+                counts["nInserted"] += 1
+                continue
+            if isinstance(operation, (DeleteOne, DeleteMany)):
+                delete = self.delete_one if isinstance(operation, DeleteOne) else self.delete_many
+                counts["nRemoved"] += (await delete(operation._filter)).deleted_count
+                continue
+            if isinstance(operation, ReplaceOne):
+                result = await self.replace_one(operation._filter, operation._doc, upsert=operation._upsert)
+            elif isinstance(operation, (UpdateOne, UpdateMany)):
+                update = self.update_one if isinstance(operation, UpdateOne) else self.update_many
+                result = await update(operation._filter, operation._doc, upsert=operation._upsert)
+            else:
+                raise NotImplementedError(f"fake_mongo does not support bulk operation {type(operation).__name__}")
+            if result.upserted_id is not None:
+                counts["nUpserted"] += 1
+                counts["upserted"].append({"index": index, "_id": result.upserted_id})
+            else:
+                counts["nMatched"] += result.matched_count
+                counts["nModified"] += result.modified_count
+        return BulkWriteResult(counts, True)
+
+    async def delete_one(self, filter, *args, **kwargs):
+        document = self._first(filter)
+        if document is None:
+            return DeleteResult({"n": 0, "ok": 1.0}, True)
+        self._documents.remove(document)
+        return DeleteResult({"n": 1, "ok": 1.0}, True)
+
+    async def delete_many(self, filter, *args, **kwargs):
+        before = len(self._documents)
+        self._documents = [doc for doc in self._documents if not matches(doc, filter)]
+        return DeleteResult({"n": before - len(self._documents), "ok": 1.0}, True)
+
+    async def find_one_and_update(self, filter, update, projection=None, sort=None, upsert=False,
+                                  return_document=ReturnDocument.BEFORE, *args, **kwargs):
+        document = self._first(filter, sort)
+        if document is None:
+            if not upsert:
+                return None
+            raw = self._update(filter, update, upsert=True)
+            document = next(doc for doc in self._documents if doc["_id"] == raw["upserted"])
+            return project(document, projection) if return_document == ReturnDocument.AFTER else None
+        before = project(document, projection)
+        updated = copy.deepcopy(document)
+        _apply_update(updated, update)
+        self._check_unique(updated, ignore=document)
+        document.clear()
+        document.update(updated)
+        return project(document, projection) if return_document == ReturnDocument.AFTER else before
+
+    async def find_one_and_delete(self, filter, projection=None, sort=None, *args, **kwargs):
+        document = self._first(filter, sort)
+        if document is None:
+            return None
+        self._documents.remove(document)
+        return project(document, projection)
+
+    async def count_documents(self, filter, *args, limit=0, **kwargs):
+        count = sum(1 for doc in self._documents if matches(doc, filter))
+        return min(count, limit) if limit else count
+
+    async def estimated_document_count(self, *args, **kwargs):
+        return len(self._documents)
+
+    async def distinct(self, key, filter=None, *args, **kwargs):
+        values = []
+        for document in self._documents:
+            if matches(document, filter):
+                value = _get_path(document, key)
+                for item in (value if isinstance(value, list) else [value]):
+                    if item is not _MISSING and item not in values:
+                        values.append(item)
+        return values
+
+    async def create_index(self, keys, *args, unique=False, **kwargs):
+        spec = _normalize_sort(keys)
+        if unique:
+            self._unique_indexes.append([key for key, _ in spec])
+        return "_".join(f"{key}_{direction}" for key, direction in spec)
+
+    async def create_indexes(self, indexes, *args, **kwargs):
+        names = []
+        for index in indexes:
+            document = index.document
+            names.append(await self.create_index(list(document["key"].items()), unique=document.get("unique", False)))
+        return names
+
+    async def drop(self):
+        self.database._collections.pop(self.name, None)
+
+
+class FakeDatabase:
+    def __init__(self, client: "FakeMongoClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections = {}
+
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self._collections:
+            self._collections[name] = FakeCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> FakeCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_collection(self, name: str) -> FakeCollection:
+        return self[name]
+
+    async def command(self, command, *args, **kwargs):
+        name = command if isinstance(command, str) else next(iter(command))
+        if name == "ping":
+            return {"ok": 1.0}
+        raise NotImplementedError(f"fake_mongo does not support command {name}")
+
+    async def list_collection_names(self, *args, **kwargs):
+        return list(self._collections)
+
+    async def drop_collection(self, name: str):
+        self._collections.pop(name, None)
+
+
+class FakeMongoClient:
+    """Motor-compatible client backed by Python dicts"""
+
+    def __init__(self, *args, **kwargs):
+        self._databases = {}
+
+    def __getitem__(self, name: str) -> FakeDatabase:
+        if name not in self._databases:
+            self._databases[name] = FakeDatabase(self, name)
+        return self._databases[name]
+
+    def __getattr__(self, name: str) -> FakeDatabase:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    def get_database(self, name: str) -> FakeDatabase:
+        return self[name]
+
+    async def drop_database(self, name):
+        database = self._databases.get(getattr(name, "name", name))
+        if database is not None:
+            database._collections.clear()
+
+    def close(self):
+        pass
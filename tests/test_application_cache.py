@@ -0,0 +1,74 @@
+def test_repeated_fetch_is_served_from_cache(api, make_user, make_application, round_trips):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    url = f"/api/applications/{application['application_id']}"
+
+    assert api.get(url, headers=headers).status_code == 200
+    round_trips.reset()
+    response = api.get(url, headers=headers)
+
+    assert response.status_code == 200
+    assert "visa_applications.find_one" not in round_trips.calls
+
+
+def test_cached_application_is_still_access_checked(api, make_user, make_application):
+    owner_id, owner_headers = make_user()
+    _, other_headers = make_user()
+    application = make_application(owner_id)
+    url = f"/api/applications/{application['application_id']}"
+
+    assert api.get(url, headers=owner_headers).status_code == 200
+    assert api.get(url, headers=other_headers).status_code == 403
+
+
+def test_writes_invalidate_cached_application(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id, version=1)
+    url = f"/api/applications/{application['application_id']}"
+    api.get(url, headers=headers)
+
+    api.patch(url, json={"version": 1, "visa_type": "student"}, headers=headers)
+    assert api.get(url, headers=headers).json()["visa_type"] == "student"
+
+    api.post(
+        f"{url}/documents",
+        params={"doc_type": "photo"},
+        files={"file": ("photo.jpg", b"photo-bytes", "image/jpeg")},
+        headers=headers
+    )
+    assert "photo" in api.get(url, headers=headers).json()["documents"]
+
+    api.post(f"{url}/submit", headers=headers)
+    assert api.get(url, headers=headers).json()["status"] == "submitted"
+
+
+def test_cached_detail_excludes_document_blobs(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id, documents={
+        "passport": {"filename": "passport.jpg", "content_type": "image/jpeg", "data": "cGFzc3BvcnQ="}
+    })
+
+    response = api.get(f"/api/applications/{application['application_id']}", headers=headers)
+
+    assert "data" not in response.json()["documents"]["passport"]
+
+
+def test_cache_evicts_least_recently_used(server):
+    cache = server.ApplicationCache(max_size=2)
+    cache.put("app_a", {"application_id": "app_a"}, cache.generation)
+    cache.put("app_b", {"application_id": "app_b"}, cache.generation)
+    cache.get("app_a")
+    cache.put("app_c", {"application_id": "app_c"}, cache.generation)
+
+    assert cache.get("app_b") is None
+    assert cache.get("app_a") is not None
+    assert cache.get("app_c") is not None
+
+
+def test_cache_skips_reads_that_raced_a_write(server):
+    cache = server.ApplicationCache(max_size=2)
+    generation = cache.generation
+    cache.invalidate("app_a")
+    cache.put("app_a", {"application_id": "app_a"}, generation)
+
+    assert cache.get("app_a") is None
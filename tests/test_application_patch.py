@@ -0,0 +1,85 @@
+import pytest
+
+
+def test_patch_sets_only_the_given_fields(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id, version=1)
+    url = f"/api/applications/{application['application_id']}"
+
+    response = api.patch(url, json={"version": 1, "travel_details": {"purpose": "Business"}}, headers=headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["version"] == 2
+    assert body["travel_details"] == {**application["travel_details"], "purpose": "Business"}
+    assert body["personal_info"] == application["personal_info"]
+    assert "documents" not in body
+
+
+def test_patch_with_stale_version_conflicts(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id, version=1)
+    url = f"/api/applications/{application['application_id']}"
+
+    first = api.patch(url, json={"version": 1, "personal_info": {"full_name": "First Edit"}}, headers=headers)
+    second = api.patch(url, json={"version": 1, "personal_info": {"full_name": "Second Edit"}}, headers=headers)
+
+    assert first.status_code == 200
+    assert second.status_code == 409
+    assert api.get(url, headers=headers).json()["personal_info"]["full_name"] == "First Edit"
+
+
+def test_patch_accepts_unversioned_documents_as_version_zero(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+
+    response = api.patch(
+        f"/api/applications/{application['application_id']}",
+        json={"version": 0, "visa_type": "student"},
+        headers=headers
+    )
+
+    assert response.status_code == 200
+    assert response.json()["version"] == 1
+    assert response.json()["visa_type"] == "student"
+
+
+def test_patch_rejects_operator_field_names(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id, version=1)
+
+    response = api.patch(
+        f"/api/applications/{application['application_id']}",
+        json={"version": 1, "personal_info": {"$where": "1"}},
+        headers=headers
+    )
+    assert response.status_code == 400
+
+
+def test_patch_by_another_user_is_forbidden(api, make_user, make_application):
+    owner_id, _ = make_user()
+    _, other_headers = make_user()
+    application = make_application(owner_id, version=1)
+
+    response = api.patch(
+        f"/api/applications/{application['application_id']}",
+        json={"version": 1, "visa_type": "student"},
+        headers=other_headers
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("status", ["submitted", "approved"])
+def test_applications_cannot_be_edited_after_submission(api, make_user, make_application, status):
+    user_id, headers = make_user()
+    application = make_application(user_id, status=status, version=1)
+    url = f"/api/applications/{application['application_id']}"
+
+    patched = api.patch(url, json={"version": 1, "personal_info": {"passport_number": "X0000000"}}, headers=headers)
+    replaced = api.put(url, json={"visa_type": "student", "personal_info": {}, "travel_details": {}}, headers=headers)
+
+    assert patched.status_code == 409
+    assert replaced.status_code == 409
+    body = api.get(url, headers=headers).json()
+    assert body["personal_info"]["passport_number"] == "P1234567"
+    assert body["visa_type"] == "tourist"
@@ -0,0 +1,93 @@
+import pytest
+
+
+@pytest.fixture
+def sent_emails(server, monkeypatch):
+    sent = []
+
+    async def record_approval(application):
+        sent.append(("approved", application["application_id"]))
+        return True
+
+    async def record_rejection(application, notes=""):
+        sent.append(("rejected", application["application_id"]))
+        return True
+
+    monkeypatch.setattr(server, "send_approval_email", record_approval)
+    monkeypatch.setattr(server, "send_rejection_email", record_rejection)
+    return sent
+
+
+def test_submit_moves_draft_to_submitted(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+
+    response = api.post(f"/api/applications/{application['application_id']}/submit", headers=headers)
+    assert response.status_code == 200
+
+    response = api.get(f"/api/applications/{application['application_id']}", headers=headers)
+    assert response.json()["status"] == "submitted"
+
+
+def test_submit_twice_conflicts(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    url = f"/api/applications/{application['application_id']}/submit"
+
+    assert api.post(url, headers=headers).status_code == 200
+    assert api.post(url, headers=headers).status_code == 409
+
+
+def test_submit_someone_elses_application_is_forbidden(api, make_user, make_application):
+    owner_id, _ = make_user()
+    _, other_headers = make_user()
+    application = make_application(owner_id)
+
+    response = api.post(f"/api/applications/{application['application_id']}/submit", headers=other_headers)
+    assert response.status_code == 403
+
+
+def test_submit_missing_application_is_not_found(api, make_user):
+    _, headers = make_user()
+    assert api.post("/api/applications/app_missing/submit", headers=headers).status_code == 404
+
+
+def test_draft_cannot_be_approved(api, make_user, make_application, sent_emails):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    application = make_application(user_id)
+
+    response = api.put(
+        f"/api/admin/applications/{application['application_id']}/status",
+        json={"status": "approved"},
+        headers=admin_headers
+    )
+    assert response.status_code == 409
+    assert sent_emails == []
+
+
+def test_unknown_status_is_rejected(api, make_user, make_application):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    application = make_application(user_id, status="submitted")
+
+    response = api.put(
+        f"/api/admin/applications/{application['application_id']}/status",
+        json={"status": "pending-forever"},
+        headers=admin_headers
+    )
+    assert response.status_code == 400
+
+
+def test_conflicting_decisions_send_one_email(api, make_user, make_application, sent_emails):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    application = make_application(user_id, status="under-review")
+    url = f"/api/admin/applications/{application['application_id']}/status"
+
+    approve = api.put(url, json={"status": "approved"}, headers=admin_headers)
+    reject = api.put(url, json={"status": "rejected", "notes": "Too late"}, headers=admin_headers)
+
+    assert approve.status_code == 200
+    assert reject.status_code == 409
+    assert sent_emails == [("approved", application["application_id"])]
@@ -0,0 +1,66 @@
+def test_summary_returns_only_list_fields_newest_first(api, make_user, make_application):
+    user_id, headers = make_user()
+    older = make_application(user_id, created_at="2026-01-01T00:00:00+00:00", documents={
+        "passport": {"filename": "passport.jpg", "content_type": "image/jpeg", "data": "cGFzc3BvcnQ="}
+    })
+    newer = make_application(user_id, created_at="2026-02-01T00:00:00+00:00")
+
+    response = api.get("/api/applications", params={"view": "summary"}, headers=headers)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [item["application_id"] for item in body["items"]] == [newer["application_id"], older["application_id"]]
+    assert set(body["items"][0]) == {"application_id", "visa_type", "status", "created_at", "updated_at"}
+    assert body["next_before"] is None
+
+
+def test_summary_paginates_on_created_at(api, make_user, make_application):
+    user_id, headers = make_user()
+    ids = [
+        make_application(user_id, created_at=f"2026-01-0{day}T00:00:00+00:00")["application_id"]
+        for day in range(1, 6)
+    ]
+
+    first = api.get("/api/applications", params={"view": "summary", "limit": 2}, headers=headers).json()
+    second = api.get(
+        "/api/applications", params={"view": "summary", "limit": 2, "before": first["next_before"]}, headers=headers
+    ).json()
+    third = api.get(
+        "/api/applications", params={"view": "summary", "limit": 2, "before": second["next_before"]}, headers=headers
+    ).json()
+
+    seen = [item["application_id"] for page in (first, second, third) for item in page["items"]]
+    assert seen == list(reversed(ids))
+    assert third["next_before"] is None
+
+
+def test_summary_pages_through_rows_sharing_a_created_at(api, make_user, make_application):
+    user_id, headers = make_user()
+    ids = {make_application(user_id, created_at="2026-01-01T00:00:00+00:00")["application_id"] for _ in range(5)}
+
+    seen, before = [], None
+    while True:
+        params = {"view": "summary", "limit": 2, **({"before": before} if before else {})}
+        page = api.get("/api/applications", params=params, headers=headers).json()
+        seen += [item["application_id"] for item in page["items"]]
+        before = page["next_before"]
+        if before is None:
+            break
+
+    assert sorted(seen) == sorted(ids)
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_summary_only_lists_own_applications(api, make_user, make_application):
+    user_id, headers = make_user()
+    other_id, _ = make_user()
+    make_application(other_id)
+
+    response = api.get("/api/applications", params={"view": "summary"}, headers=headers)
+
+    assert response.json()["items"] == []
+
+
+def test_unknown_view_is_rejected(api, make_user):
+    _, headers = make_user()
+    assert api.get("/api/applications", params={"view": "compact"}, headers=headers).status_code == 400
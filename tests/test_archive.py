@@ -0,0 +1,129 @@
+import base64
+import json
+from datetime import datetime, timezone, timedelta
+
+
+def days_ago(days: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+def test_archiver_moves_only_old_decisions(server, run, api, make_user, make_application):
+    user_id, _ = make_user()
+    old = make_application(user_id, status="approved", version=3, decided_at=days_ago(200))
+    legacy = make_application(user_id, status="rejected", updated_at=days_ago(400))
+    recent = make_application(user_id, status="approved", version=3, decided_at=days_ago(5))
+    draft = make_application(user_id, status="draft", updated_at=days_ago(400))
+
+    archived = run(server.archive_decided_applications, older_than_days=180, pause_seconds=0)
+
+    assert archived == 2
+    live_ids = {app["application_id"] for app in run(server.db.visa_applications.find({}, {"application_id": 1}).to_list, 10)}
+    assert live_ids == {recent["application_id"], draft["application_id"]}
+    archive_ids = {app["application_id"] for app in run(server.db.visa_applications_archive.find({}).to_list, 10)}
+    assert archive_ids == {old["application_id"], legacy["application_id"]}
+
+
+def test_archiver_is_idempotent_across_batches(server, run, api, make_user, make_application):
+    user_id, _ = make_user()
+    for _ in range(5):
+        make_application(user_id, status="approved", decided_at=days_ago(200))
+
+    assert run(server.archive_decided_applications, older_than_days=180, batch_size=2, pause_seconds=0) == 5
+    assert run(server.archive_decided_applications, older_than_days=180, batch_size=2, pause_seconds=0) == 0
+    assert run(server.db.visa_applications_archive.count_documents, {}) == 5
+
+
+def test_archived_blobs_are_compressed_and_restored(server, run, api, make_user, make_application):
+    user_id, _ = make_user()
+    photo = base64.b64encode(b"photo-bytes" * 100).decode("utf-8")
+    application = make_application(user_id, status="approved", decided_at=days_ago(200), documents={
+        "photo": {"filename": "photo.jpg", "content_type": "image/jpeg", "data": photo}
+    })
+
+    run(server.archive_decided_applications, older_than_days=180, pause_seconds=0)
+
+    stored = run(server.db.visa_applications_archive.find_one, {"application_id": application["application_id"]})
+    assert stored["documents"]["photo"]["compression"] == "zlib"
+    assert len(stored["documents"]["photo"]["data"]) < len(photo)
+
+    restored = run(server.find_application, application["application_id"], {"_id": 0})
+    assert restored["documents"]["photo"] == {"filename": "photo.jpg", "content_type": "image/jpeg", "data": photo}
+
+
+def test_archived_inline_documents_can_be_downloaded(server, run, api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id, status="approved", decided_at=days_ago(200), documents={
+        "passport": {"filename": "passport.jpg", "content_type": "image/jpeg",
+                     "data": base64.b64encode(b"legacy-scan").decode("utf-8")}
+    })
+    run(server.archive_decided_applications, older_than_days=180, pause_seconds=0)
+    server.application_cache.clear()
+
+    response = api.get(f"/api/applications/{application['application_id']}/documents/passport", headers=headers)
+
+    assert response.status_code == 200
+    assert response.content == b"legacy-scan"
+
+
+def test_reads_by_id_fall_through_to_archive(server, run, api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id, status="approved", decided_at=days_ago(200))
+    run(server.archive_decided_applications, older_than_days=180, pause_seconds=0)
+
+    response = api.get(f"/api/applications/{application['application_id']}", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "approved"
+
+
+def test_archived_applications_cannot_change_status(server, run, api, make_user, make_application):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    application = make_application(user_id, status="approved", decided_at=days_ago(200))
+    run(server.archive_decided_applications, older_than_days=180, pause_seconds=0)
+
+    response = api.put(
+        f"/api/admin/applications/{application['application_id']}/status",
+        json={"status": "rejected"},
+        headers=admin_headers
+    )
+    assert response.status_code == 404
+
+
+def test_archived_applications_stay_in_lists_and_exports(server, run, api, make_user, make_application):
+    user_id, headers = make_user()
+    _, admin_headers = make_user(role="admin")
+    archived = make_application(user_id, status="approved", decided_at=days_ago(200), documents={
+        "photo": {"filename": "photo.jpg", "content_type": "image/jpeg", "data": base64.b64encode(b"photo").decode()}
+    })
+    live = make_application(user_id, status="submitted")
+    run(server.archive_decided_applications, older_than_days=180, pause_seconds=0)
+    both = {archived["application_id"], live["application_id"]}
+
+    full = api.get("/api/applications", headers=headers).json()
+    summary = api.get("/api/applications", params={"view": "summary"}, headers=headers).json()
+    admin = api.get("/api/admin/applications", headers=admin_headers).json()
+    export = api.get("/api/admin/applications/export", params={"format": "ndjson"}, headers=admin_headers)
+
+    assert {app["application_id"] for app in full} == both
+    assert {item["application_id"] for item in summary["items"]} == both
+    assert {app["application_id"] for app in admin} == both
+    assert {json.loads(line)["application_id"] for line in export.text.splitlines()} == both
+    listed = next(app for app in full if app["application_id"] == archived["application_id"])
+    assert listed["documents"]["photo"]["filename"] == "photo.jpg"
+    assert not {"data", "compression"} & set(listed["documents"]["photo"])
+
+
+def test_admin_list_and_export_can_skip_the_archive(server, run, api, make_user, make_application):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    make_application(user_id, status="approved", decided_at=days_ago(200))
+    live = make_application(user_id, status="submitted")
+    run(server.archive_decided_applications, older_than_days=180, pause_seconds=0)
+    params = {"include_archived": "false"}
+
+    admin = api.get("/api/admin/applications", params=params, headers=admin_headers).json()
+    export = api.get("/api/admin/applications/export", params={**params, "format": "ndjson"}, headers=admin_headers)
+
+    assert [app["application_id"] for app in admin] == [live["application_id"]]
+    assert [json.loads(line)["application_id"] for line in export.text.splitlines()] == [live["application_id"]]
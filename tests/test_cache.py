@@ -0,0 +1,116 @@
+import pytest
+
+
+def test_memory_backend_evicts_least_recently_used(server, run, api):
+    cache = server.Cache("test", server.MemoryCacheBackend(max_entries=2), ttl_seconds=60)
+    run(cache.set, "a", 1)
+    run(cache.set, "b", 2)
+    run(cache.get, "a")
+    run(cache.set, "c", 3)
+
+    assert run(cache.get, "a") == 1
+    assert run(cache.get, "b") is None
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 0.667}
+
+
+def test_expired_entries_are_misses(server, run, api, monkeypatch):
+    cache = server.Cache("test", server.MemoryCacheBackend(max_entries=10), ttl_seconds=60)
+    run(cache.set, "a", 1)
+    now = server.time.monotonic()
+    monkeypatch.setattr(server.time, "monotonic", lambda: now + 61)
+
+    assert run(cache.get, "a") is None
+
+
+def test_mongo_backend_is_shared_and_namespaced(server, run, api):
+    first_worker = server.Cache("letters", server.MongoCacheBackend(), ttl_seconds=60)
+    second_worker = server.Cache("letters", server.MongoCacheBackend(), ttl_seconds=60)
+    other_namespace = server.Cache("pdfs", server.MongoCacheBackend(), ttl_seconds=60)
+    run(first_worker.set, "app_1", "letter text")
+    run(other_namespace.set, "app_1", b"%PDF")
+
+    assert run(second_worker.get, "app_1") == "letter text"
+
+    run(second_worker.clear)
+    assert run(first_worker.get, "app_1") is None
+    assert run(other_namespace.get, "app_1") == b"%PDF"
+
+
+def test_mongo_backend_ignores_expired_entries(server, run, api):
+    cache = server.Cache("letters", server.MongoCacheBackend(), ttl_seconds=60)
+    run(cache.set, "app_1", "letter text", ttl_seconds=-1)
+    assert run(cache.get, "app_1") is None
+
+
+def test_repeated_requests_reuse_the_cached_session(api, make_user, round_trips):
+    _, headers = make_user()
+
+    api.get("/api/auth/me", headers=headers)
+    round_trips.reset()
+    api.get("/api/auth/me", headers=headers)
+
+    assert round_trips.calls == []
+
+
+def test_logout_drops_the_cached_session(api, make_user):
+    _, headers = make_user()
+    assert api.get("/api/auth/me", headers=headers).status_code == 200
+
+    api.post("/api/auth/logout", headers=headers)
+
+    assert api.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_role_change_is_visible_to_cached_sessions(api, make_user):
+    user_id, headers = make_user()
+    _, admin_headers = make_user(role="admin")
+    assert api.get("/api/auth/me", headers=headers).json()["role"] == "user"
+
+    api.put(f"/api/admin/users/{user_id}/role", json={"role": "admin"}, headers=admin_headers)
+
+    assert api.get("/api/auth/me", headers=headers).json()["role"] == "admin"
+
+
+def test_ending_one_users_sessions_keeps_other_cached_sessions(api, make_user, round_trips):
+    user_id, headers = make_user()
+    _, other_headers = make_user()
+    _, admin_headers = make_user(role="admin")
+    api.get("/api/auth/me", headers=other_headers)
+
+    api.put(f"/api/admin/users/{user_id}/role", json={"role": "admin"}, headers=admin_headers)
+    api.post("/api/auth/logout-all", headers=headers)
+    round_trips.reset()
+    api.get("/api/auth/me", headers=other_headers)
+
+    assert round_trips.calls == []
+    assert api.get("/api/auth/me", headers=headers).status_code == 401
+
+
+def test_rendered_pdf_is_reused(server, run, api, make_user, make_application, monkeypatch):
+    user_id, _ = make_user()
+    application = make_application(user_id, status="approved")
+    renders = []
+    create_visa_pdf = server.create_visa_pdf
+
+    def counting_create(content, app):
+        renders.append(app["application_id"])
+        return create_visa_pdf(content, app)
+
+    monkeypatch.setattr(server, "create_visa_pdf", counting_create)
+    first = run(server.render_visa_pdf, "Visa approved.", application)
+    second = run(server.render_visa_pdf, "Visa approved.", application)
+
+    assert first == second
+    assert first.startswith(b"%PDF")
+    assert renders == [application["application_id"]]
+    assert server.caches["visa_pdfs"].stats()["hits"] == 1
+
+
+def test_ready_reports_cache_metrics(api, make_user):
+    _, headers = make_user()
+    api.get("/api/auth/me", headers=headers)
+    api.get("/api/auth/me", headers=headers)
+
+    sessions = api.get("/api/health/ready").json()["caches"]["sessions"]
+    assert sessions["hits"] >= 1
+    assert sessions["misses"] >= 1
@@ -0,0 +1,110 @@
+def test_application_detail_revalidates_with_etag(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id, version=1)
+    url = f"/api/applications/{application['application_id']}"
+
+    first = api.get(url, headers=headers)
+    etag = first.headers["ETag"]
+    assert first.headers["Last-Modified"]
+
+    cached = api.get(url, headers={**headers, "If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    api.patch(url, json={"version": 1, "visa_type": "student"}, headers=headers)
+    changed = api.get(url, headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_application_detail_honours_if_modified_since(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    url = f"/api/applications/{application['application_id']}"
+
+    last_modified = api.get(url, headers=headers).headers["Last-Modified"]
+    response = api.get(url, headers={**headers, "If-Modified-Since": last_modified})
+
+    assert response.status_code == 304
+
+
+def test_unchanged_list_is_answered_without_fetching_documents(api, make_user, make_application, round_trips):
+    user_id, headers = make_user()
+    make_application(user_id)
+    make_application(user_id)
+    etag = api.get("/api/applications", headers=headers).headers["ETag"]
+
+    round_trips.reset()
+    response = api.get("/api/applications", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    # Only the covered newest-updated_at lookup; the documents themselves are never read
+    assert round_trips.calls.count("visa_applications.find.to_list") == 1
+    assert "visa_applications.aggregate.to_list" not in round_trips.calls
+
+
+def test_list_etag_changes_when_an_application_is_added(api, make_user, make_application):
+    user_id, headers = make_user()
+    make_application(user_id)
+    etag = api.get("/api/applications", headers=headers).headers["ETag"]
+
+    make_application(user_id)
+    response = api.get("/api/applications", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+def test_admin_list_revalidates_with_etag(api, make_user, make_application):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    make_application(user_id, status="submitted")
+    etag = api.get("/api/admin/applications", headers=admin_headers).headers["ETag"]
+
+    response = api.get("/api/admin/applications", headers={**admin_headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+
+
+def test_large_lists_are_gzip_compressed(api, make_user, make_application):
+    user_id, headers = make_user()
+    for _ in range(10):
+        make_application(user_id)
+
+    response = api.get("/api/applications", headers={**headers, "Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert len(response.json()) == 10
+
+
+def test_list_etag_revalidates_past_the_row_cap(server, run, api, make_user):
+    _, admin_headers = make_user(role="admin")
+    run(server.db.visa_applications.insert_many, [
+        {"application_id": f"app_{i:04d}", "user_id": "user_bulk", "visa_type": "tourist", "status": "submitted",
+         "personal_info": {}, "travel_details": {}, "documents": {},
+         "created_at": "2026-01-01T00:00:00+00:00", "updated_at": "2026-01-01T00:00:00+00:00"}
+        for i in range(1001)
+    ])
+    first = api.get("/api/admin/applications", headers=admin_headers)
+    assert len(first.json()) == 1000
+
+    response = api.get("/api/admin/applications", headers={**admin_headers, "If-None-Match": first.headers["ETag"]})
+
+    assert response.status_code == 304
+
+
+def test_documents_are_not_gzip_compressed(api, make_user, make_application, upload):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    scan = b"passport-scan" * 200
+    upload(headers, application["application_id"], content=scan)
+
+    response = api.get(
+        f"/api/applications/{application['application_id']}/documents/passport",
+        headers={**headers, "Accept-Encoding": "gzip"}
+    )
+
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+    assert response.content == scan
@@ -0,0 +1,75 @@
+import base64
+import hashlib
+
+
+def blob(server, run, content):
+    return run(server.db.document_blobs.find_one, {"_id": hashlib.sha256(content).hexdigest()})
+
+
+def test_same_file_on_two_applications_is_stored_once(server, run, api, make_user, make_application, upload):
+    user_id, headers = make_user()
+    first = make_application(user_id)
+    second = make_application(user_id)
+
+    assert upload(headers, first["application_id"], b"passport-scan").status_code == 200
+    assert upload(headers, second["application_id"], b"passport-scan").status_code == 200
+
+    assert run(server.db.document_blobs.count_documents, {}) == 1
+    assert blob(server, run, b"passport-scan")["ref_count"] == 2
+    stored = run(server.db.visa_applications.find_one, {"application_id": second["application_id"]})
+    assert "data" not in stored["documents"]["passport"]
+    assert stored["documents"]["passport"]["sha256"] == hashlib.sha256(b"passport-scan").hexdigest()
+
+
+def test_duplicate_upload_skips_storing_content(server, api, make_user, make_application, round_trips, upload):
+    user_id, headers = make_user()
+    first = make_application(user_id)
+    second = make_application(user_id)
+    upload(headers, first["application_id"], b"photo-bytes", "photo")
+
+    round_trips.reset()
+    upload(headers, second["application_id"], b"photo-bytes", "photo")
+
+    assert round_trips.calls.count("document_blobs.update_one") == 0
+
+
+def test_replacing_a_document_releases_the_old_blob(server, run, api, make_user, make_application, upload):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+
+    upload(headers, application["application_id"], b"old-scan")
+    upload(headers, application["application_id"], b"new-scan")
+
+    assert blob(server, run, b"old-scan")["ref_count"] == 0
+    assert blob(server, run, b"new-scan")["ref_count"] == 1
+
+
+def test_collector_deletes_only_unreferenced_blobs(server, run, api, make_user, make_application, upload):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    upload(headers, application["application_id"], b"old-scan")
+    upload(headers, application["application_id"], b"new-scan")
+
+    assert run(server.collect_unreferenced_blobs) == 1
+    assert blob(server, run, b"old-scan") is None
+    assert blob(server, run, b"new-scan") is not None
+
+
+def test_upload_to_someone_elses_application_keeps_no_reference(server, run, api, make_user, make_application, upload):
+    owner_id, _ = make_user()
+    _, other_headers = make_user()
+    application = make_application(owner_id)
+
+    assert upload(other_headers, application["application_id"], b"intruder").status_code == 403
+    assert blob(server, run, b"intruder")["ref_count"] == 0
+
+
+def test_document_data_is_loaded_from_blob_store(server, run, api, make_user, make_application, upload):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    upload(headers, application["application_id"], b"photo-bytes", "photo")
+
+    stored = run(server.db.visa_applications.find_one, {"application_id": application["application_id"]}, {"_id": 0})
+    loaded = run(server.load_document_data, stored, ["photo"])
+
+    assert base64.b64decode(loaded["documents"]["photo"]["data"]) == b"photo-bytes"
@@ -0,0 +1,108 @@
+import base64
+
+
+def test_detail_lists_document_metadata_only(api, make_user, make_application, upload):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    upload(headers, application["application_id"], b"photo-bytes", "photo")
+
+    response = api.get(f"/api/applications/{application['application_id']}", headers=headers)
+
+    photo = response.json()["documents"]["photo"]
+    assert set(photo) == {"filename", "content_type", "size", "uploaded_at"}
+    assert photo["size"] == len(b"photo-bytes")
+    assert photo["content_type"] == "image/jpeg"
+
+
+def test_document_bytes_are_served_on_demand(api, make_user, make_application, upload):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    upload(headers, application["application_id"], b"photo-bytes", "photo")
+
+    response = api.get(f"/api/applications/{application['application_id']}/documents/photo", headers=headers)
+
+    assert response.status_code == 200
+    assert response.content == b"photo-bytes"
+    assert response.headers["content-type"] == "image/jpeg"
+
+    cached = api.get(
+        f"/api/applications/{application['application_id']}/documents/photo",
+        headers={**headers, "If-None-Match": response.headers["ETag"]}
+    )
+    assert cached.status_code == 304
+
+
+def test_legacy_inline_documents_are_served(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id, documents={
+        "passport": {"filename": "passport.jpg", "content_type": "image/jpeg",
+                     "data": base64.b64encode(b"legacy-scan").decode("utf-8")}
+    })
+
+    response = api.get(f"/api/applications/{application['application_id']}/documents/passport", headers=headers)
+
+    assert response.content == b"legacy-scan"
+
+
+def test_include_documents_inlines_base64_data(api, make_user, make_application, upload):
+    user_id, headers = make_user()
+    application = make_application(user_id, documents={
+        "passport": {"filename": "passport.jpg", "content_type": "image/jpeg",
+                     "data": base64.b64encode(b"legacy-scan").decode("utf-8")}
+    })
+    upload(headers, application["application_id"], b"photo-bytes", "photo")
+
+    response = api.get(
+        f"/api/applications/{application['application_id']}", params={"include": "documents"}, headers=headers
+    )
+
+    documents = response.json()["documents"]
+    assert base64.b64decode(documents["photo"]["data"]) == b"photo-bytes"
+    assert base64.b64decode(documents["passport"]["data"]) == b"legacy-scan"
+
+
+def test_documents_are_access_checked(api, make_user, make_application, upload):
+    owner_id, owner_headers = make_user()
+    _, other_headers = make_user()
+    _, admin_headers = make_user(role="admin")
+    application = make_application(owner_id)
+    upload(owner_headers, application["application_id"], b"photo-bytes", "photo")
+    url = f"/api/applications/{application['application_id']}/documents/photo"
+
+    assert api.get(url, headers=other_headers).status_code == 403
+    assert api.get(url, headers=admin_headers).status_code == 200
+
+
+def test_missing_document_is_not_found(api, make_user, make_application):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+
+    response = api.get(f"/api/applications/{application['application_id']}/documents/passport", headers=headers)
+
+    assert response.status_code == 404
+
+
+def test_untrusted_content_types_are_downloaded_not_rendered(api, make_user, make_application, upload):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    upload(headers, application["application_id"], b"<script>alert(1)</script>", "passport",
+           content_type="text/html", filename="passport.html")
+
+    response = api.get(f"/api/applications/{application['application_id']}/documents/passport", headers=headers)
+
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["content-disposition"].startswith("attachment;")
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert "sandbox" in response.headers["content-security-policy"]
+
+
+def test_allowed_images_are_served_inline(api, make_user, make_application, upload):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    upload(headers, application["application_id"], b"png-bytes", "photo", content_type="image/png")
+
+    response = api.get(f"/api/applications/{application['application_id']}/documents/photo", headers=headers)
+
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["content-disposition"] == 'inline; filename="photo.jpg"'
+    assert response.headers["x-content-type-options"] == "nosniff"
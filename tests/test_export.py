@@ -0,0 +1,63 @@
+import csv
+import json
+from io import StringIO
+
+
+def test_csv_export_flattens_application_fields(api, make_user, make_application):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    application = make_application(user_id, status="submitted", documents={
+        "passport": {"filename": "passport.jpg", "content_type": "image/jpeg", "data": "cGFzc3BvcnQ="}
+    })
+
+    response = api.get("/api/admin/applications/export", params={"format": "csv"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(StringIO(response.text)))
+    assert len(rows) == 1
+    assert rows[0]["application_id"] == application["application_id"]
+    assert rows[0]["personal_info.full_name"] == "Test Applicant"
+    assert rows[0]["travel_details.purpose"] == "Tourism"
+    assert "cGFzc3BvcnQ=" not in response.text
+
+
+def test_ndjson_export_streams_every_batch(api, server, make_user, make_application, monkeypatch):
+    monkeypatch.setattr(server, "EXPORT_BATCH_SIZE", 2)
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    ids = {make_application(user_id)["application_id"] for _ in range(5)}
+
+    response = api.get("/api/admin/applications/export", params={"format": "ndjson"}, headers=admin_headers)
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert {row["application_id"] for row in rows} == ids
+    assert rows[0]["personal_info.nationality"] == "Felinia"
+
+
+def test_export_applies_filters_and_date_range(api, make_user, make_application):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    make_application(user_id, status="approved", created_at="2026-01-10T00:00:00+00:00")
+    make_application(user_id, status="approved", created_at="2026-03-10T00:00:00+00:00")
+    make_application(user_id, status="rejected", created_at="2026-03-11T00:00:00+00:00")
+
+    response = api.get(
+        "/api/admin/applications/export",
+        params={"format": "ndjson", "status": "approved", "created_from": "2026-02-01T00:00:00Z"},
+        headers=admin_headers
+    )
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["created_at"] for row in rows] == ["2026-03-10T00:00:00+00:00"]
+
+
+def test_export_requires_admin(api, make_user):
+    _, headers = make_user()
+    assert api.get("/api/admin/applications/export", headers=headers).status_code == 403
+
+
+def test_export_rejects_unknown_format(api, make_user):
+    _, admin_headers = make_user(role="admin")
+    response = api.get("/api/admin/applications/export", params={"format": "xlsx"}, headers=admin_headers)
+    assert response.status_code == 400
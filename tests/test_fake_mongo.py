@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from .fake_mongo import FakeMongoClient
+
+
+@pytest.fixture
+def collection():
+    return FakeMongoClient()["fake_test"].items
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_find_applies_query_projection_sort_and_limit(collection):
+    run(collection.insert_many([
+        {"name": "a", "status": "approved", "documents": {"photo": {"data": "x", "size": 1}}, "rank": 2},
+        {"name": "b", "status": "approved", "documents": {"photo": {"data": "y", "size": 2}}, "rank": 1},
+        {"name": "c", "status": "draft", "rank": 0},
+    ]))
+
+    cursor = collection.find({"status": {"$in": ["approved"]}}, {"_id": 0, "documents.photo.data": 0})
+    found = run(cursor.sort("rank", 1).limit(1).to_list(None))
+
+    assert found == [{"name": "b", "status": "approved", "documents": {"photo": {"size": 2}}, "rank": 1}]
+
+
+def test_update_operators_and_return_document(collection):
+    from pymongo import ReturnDocument
+
+    run(collection.insert_one({"application_id": "app_1", "version": 1, "status": "draft"}))
+    updated = run(collection.find_one_and_update(
+        {"application_id": "app_1", "status": "draft"},
+        {"$set": {"status": "submitted"}, "$inc": {"version": 1}},
+        projection={"_id": 0},
+        return_document=ReturnDocument.AFTER
+    ))
+
+    assert updated == {"application_id": "app_1", "version": 2, "status": "submitted"}
+    assert run(collection.update_one({"status": "draft"}, {"$set": {"status": "x"}})).matched_count == 0
+
+
+def test_unique_indexes_and_ids_are_enforced(collection):
+    run(collection.create_index("email", unique=True))
+    run(collection.insert_one({"_id": "one", "email": "a@example.com"}))
+
+    with pytest.raises(DuplicateKeyError):
+        run(collection.insert_one({"email": "a@example.com"}))
+    with pytest.raises(DuplicateKeyError):
+        run(collection.insert_one({"_id": "one"}))
+
+
+def test_unsupported_operators_fail_loudly(collection):
+    run(collection.insert_one({"tags": [{"x": 1}]}))
+    with pytest.raises(NotImplementedError):
+        run(collection.find_one({"tags": {"$elemMatch": {"x": 1}}}))
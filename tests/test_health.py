@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+
+class UnreachableDatabase:
+    async def command(self, *args, **kwargs):
+        raise ConnectionError("no servers available")
+
+
+def test_live_does_not_need_the_database(api, server, monkeypatch):
+    monkeypatch.setattr(server, "db", UnreachableDatabase())
+
+    response = api.get("/api/health/live")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+def test_ready_reports_ping_latency_and_pool_stats(api):
+    response = api.get("/api/health/ready")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["db_ping_ms"] >= 0
+    assert set(body["pool"]["checkout_wait_ms"]) == {"p50", "p95", "max"}
+
+
+def test_ready_is_unavailable_when_mongo_is_down(api, server, monkeypatch):
+    monkeypatch.setattr(server, "db", UnreachableDatabase())
+
+    response = api.get("/api/health/ready")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "unavailable"
+
+
+def test_pool_monitor_separates_exhaustion_from_other_failures(server):
+    monitor = server.PoolMonitor()
+    event = SimpleNamespace(address=("localhost", 27017), connection_id=1)
+
+    monitor.connection_check_out_started(event)
+    monitor.connection_checked_out(event)
+    monitor.connection_check_out_started(event)
+    monitor.connection_check_out_failed(SimpleNamespace(reason=server.monitoring.ConnectionCheckOutFailedReason.TIMEOUT))
+    monitor.connection_check_out_failed(SimpleNamespace(reason=server.monitoring.ConnectionCheckOutFailedReason.CONN_ERROR))
+
+    stats = monitor.stats()
+    assert stats["in_use"] == 1
+    assert stats["checkout_timeouts"] == 1
+    assert stats["checkout_failures"] == 1
+    assert stats["checkout_wait_ms"]["max"] >= 0
+
+    monitor.connection_checked_in(event)
+    assert monitor.stats()["in_use"] == 0
@@ -0,0 +1,76 @@
+import io
+import json
+import logging
+
+import pytest
+
+
+@pytest.fixture
+def log_lines(server):
+    """Capture what the listener thread writes; stopping the listener flushes the queue"""
+    stream = io.StringIO()
+    previous = server.log_stream_handler.setStream(stream)
+
+    def collect():
+        server.stop_logging()
+        server.log_listener.start()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield collect
+    server.log_stream_handler.setStream(previous)
+
+
+def test_access_line_carries_request_and_application_ids(api, make_user, make_application, log_lines):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+
+    response = api.get(
+        f"/api/applications/{application['application_id']}",
+        headers={**headers, "X-Request-ID": "req-123"}
+    )
+
+    assert response.headers["X-Request-ID"] == "req-123"
+    access = [line for line in log_lines() if line.get("path", "").startswith("/api/applications/")]
+    assert access[-1]["request_id"] == "req-123"
+    assert access[-1]["application_id"] == application["application_id"]
+    assert access[-1]["status"] == 200
+
+
+def test_handler_logs_inherit_the_request_context(server, api, make_user, make_application, log_lines, monkeypatch):
+    def fail(params):
+        raise RuntimeError("provider unavailable")
+
+    monkeypatch.setattr(server, "send_email", fail)
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    application = make_application(user_id, status="submitted")
+
+    response = api.put(
+        f"/api/admin/applications/{application['application_id']}/status",
+        json={"status": "rejected"},
+        headers=admin_headers
+    )
+    api.get("/api/health/live")
+
+    errors = [line for line in log_lines() if line["level"] == "ERROR"]
+    assert errors[0]["message"] == "Failed to send rejection email"
+    assert errors[0]["request_id"] == response.headers["X-Request-ID"]
+    assert errors[0]["application_id"] == application["application_id"]
+    assert "provider unavailable" in errors[0]["exception"]
+
+
+def test_unsafe_request_ids_are_replaced(api):
+    response = api.get("/api/health/live", headers={"X-Request-ID": "bad id\nwith newline"})
+    assert response.headers["X-Request-ID"] != "bad id\nwith newline"
+    assert len(response.headers["X-Request-ID"]) == 32
+
+
+def test_sampling_only_drops_flagged_info_lines(server):
+    sampler = server.SamplingFilter(0.0)
+
+    def record(level, **extra):
+        return logging.makeLogRecord({"levelno": level, "msg": "line", **extra})
+
+    assert not sampler.filter(record(logging.INFO, sampled=True))
+    assert sampler.filter(record(logging.INFO))
+    assert sampler.filter(record(logging.WARNING, sampled=True))
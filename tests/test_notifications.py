@@ -0,0 +1,168 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def outbox(server, monkeypatch):
+    sent = []
+
+    def send(params):
+        sent.append(params)
+        return {"id": f"email_{len(sent)}"}
+
+    async def letter(application):
+        return "Visa approved."
+
+    monkeypatch.setattr(server, "send_email", send)
+    monkeypatch.setattr(server, "generate_visa_document_with_ai", letter)
+    return sent
+
+
+@pytest.fixture
+def batched(server, monkeypatch):
+    monkeypatch.setattr(server, "ADMIN_NOTIFICATION_FLUSH_SECONDS", 60)
+
+
+def decide(api, headers, application_id, status, notes=None):
+    body = {"status": status, **({"notes": notes} if notes else {})}
+    return api.put(f"/api/admin/applications/{application_id}/status", json=body, headers=headers)
+
+
+def test_applicant_email_is_sent_separately_from_admins(server, run, api, make_user, make_application, outbox):
+    user_id, _ = make_user()
+    make_user(role="admin", email="admin@meowls.gov")
+    application = make_application(user_id, status="submitted")
+
+    assert run(server.send_approval_email, application) is True
+
+    assert len(outbox) == 1
+    assert outbox[0]["to"] == ["applicant@example.com"]
+    assert outbox[0]["attachments"]
+
+
+def test_decisions_are_batched_into_one_admin_email(server, run, api, make_user, make_application, outbox, batched,
+                                                    monkeypatch):
+    async def no_email(*args, **kwargs):
+        return True
+
+    monkeypatch.setattr(server, "send_approval_email", no_email)
+    monkeypatch.setattr(server, "send_rejection_email", no_email)
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin", email="admin@meowls.gov")
+    make_user(role="admin", email="second.admin@meowls.gov")
+    approved = make_application(user_id, status="submitted")
+    rejected = make_application(user_id, status="submitted")
+
+    decide(api, admin_headers, approved["application_id"], "approved")
+    decide(api, admin_headers, rejected["application_id"], "rejected", notes="Missing photo")
+    assert outbox == []
+
+    assert run(server.flush_admin_notifications) == 2
+
+    assert len(outbox) == 1
+    assert sorted(outbox[0]["to"]) == ["admin@meowls.gov", "second.admin@meowls.gov"]
+    assert approved["application_id"] in outbox[0]["html"]
+    assert "Missing photo" in outbox[0]["html"]
+    assert "attachments" not in outbox[0]
+    assert server.admin_notification_queue == []
+
+
+def test_admin_recipients_are_cached(server, run, api, make_user, make_application, outbox, batched, round_trips):
+    user_id, _ = make_user()
+    make_user(role="admin")
+    for _ in range(2):
+        server.queue_admin_notification({**make_application(user_id, status="approved"), "status": "approved"})
+        run(server.flush_admin_notifications)
+
+    assert round_trips.calls.count("users.find.to_list") == 1
+    assert len(outbox) == 2
+
+
+def test_role_change_refreshes_admin_recipients(server, run, api, make_user, make_application, outbox):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin", email="admin@meowls.gov")
+    promoted_id, _ = make_user(email="promoted@meowls.gov")
+    assert run(server.get_admin_emails) == ["admin@meowls.gov"]
+
+    response = api.put(f"/api/admin/users/{promoted_id}/role", json={"role": "admin"}, headers=admin_headers)
+
+    assert response.status_code == 200
+    assert sorted(run(server.get_admin_emails)) == ["admin@meowls.gov", "promoted@meowls.gov"]
+
+
+def test_role_change_requires_admin(api, make_user):
+    user_id, headers = make_user()
+    assert api.put(f"/api/admin/users/{user_id}/role", json={"role": "admin"}, headers=headers).status_code == 403
+
+
+def test_failed_admin_email_keeps_decisions_queued(server, run, api, make_user, make_application, batched,
+                                                   monkeypatch):
+    def fail(params):
+        raise RuntimeError("provider unavailable")
+
+    monkeypatch.setattr(server, "send_email", fail)
+    user_id, _ = make_user()
+    make_user(role="admin")
+    server.queue_admin_notification(make_application(user_id, status="approved"))
+
+    assert run(server.flush_admin_notifications) == 0
+    assert len(server.admin_notification_queue) == 1
+
+
+def test_decisions_are_sent_immediately_without_a_flush_interval(server, run, api, make_user, make_application, outbox,
+                                                                 monkeypatch):
+    async def no_email(*args, **kwargs):
+        return True
+
+    monkeypatch.setattr(server, "send_approval_email", no_email)
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin", email="admin@meowls.gov")
+    application = make_application(user_id, status="submitted")
+
+    assert decide(api, admin_headers, application["application_id"], "approved").status_code == 200
+    for _ in range(100):
+        if outbox:
+            break
+        run(asyncio.sleep, 0.01)
+
+    assert len(outbox) == 1
+    assert application["application_id"] in outbox[0]["html"]
+    assert server.admin_notification_queue == []
+
+
+def test_requeued_decisions_are_bounded(server, run, api, make_user, make_application, batched, monkeypatch):
+    def fail(params):
+        raise RuntimeError("provider unavailable")
+
+    monkeypatch.setattr(server, "send_email", fail)
+    monkeypatch.setattr(server, "ADMIN_NOTIFICATION_QUEUE_LIMIT", 2)
+    user_id, _ = make_user()
+    make_user(role="admin")
+    applications = [make_application(user_id, status="approved") for _ in range(2)]
+    for application in applications:
+        server.queue_admin_notification(application)
+
+    assert run(server.flush_admin_notifications) == 0
+    newest = make_application(user_id, status="approved")
+    server.queue_admin_notification(newest)
+
+    assert [item["application_id"] for item in server.admin_notification_queue] == [
+        applications[1]["application_id"], newest["application_id"]
+    ]
+
+
+def test_background_sends_are_held_until_done(server, run, api, make_user, make_application, outbox):
+    user_id, _ = make_user()
+    make_user(role="admin")
+    application = make_application(user_id, status="approved")
+
+    async def queue_and_inspect():
+        server.queue_admin_notification(application)
+        pending = set(server.email_tasks)
+        await asyncio.gather(*pending)
+        return pending
+
+    assert len(run(queue_and_inspect)) == 1
+    assert server.email_tasks == set()
+    assert len(outbox) == 1
@@ -0,0 +1,247 @@
+"""Database round-trip budgets for every API endpoint.
+
+Each route declares how many Mongo round trips a single request may make,
+including the two lookups in get_current_user. Adding a query to a route
+makes its test fail until the budget here is deliberately raised.
+"""
+import pytest
+
+ROUND_TRIP_BUDGETS = {
+    ("POST", "/api/auth/register"): 4,
+    ("POST", "/api/auth/login"): 3,
+    ("POST", "/api/auth/session"): 5,
+    ("GET", "/api/auth/me"): 2,
+    ("POST", "/api/auth/logout"): 1,
+    ("POST", "/api/auth/logout-all"): 4,
+    ("POST", "/api/applications"): 3,
+    # Lists: four concurrent index-only validator lookups (live and archive), then the rows of each
+    ("GET", "/api/applications"): 8,
+    ("GET", "/api/applications/{application_id}"): 3,
+    ("GET", "/api/applications/{application_id}/documents/{doc_type}"): 4,
+    ("PUT", "/api/applications/{application_id}"): 5,
+    ("PATCH", "/api/applications/{application_id}"): 3,
+    ("POST", "/api/applications/{application_id}/documents"): 5,
+    ("POST", "/api/applications/{application_id}/submit"): 3,
+    ("GET", "/api/admin/applications"): 8,
+    ("GET", "/api/admin/applications/export"): 4,
+    ("PUT", "/api/admin/applications/{application_id}/status"): 3,
+    ("PUT", "/api/admin/users/{user_id}/role"): 4,
+    ("GET", "/api/health/live"): 0,
+    ("GET", "/api/health/ready"): 1,
+}
+
+APPLICATION_PAYLOAD = {
+    "visa_type": "business",
+    "personal_info": {
+        "full_name": "Test Applicant",
+        "email": "applicant@example.com",
+        "nationality": "Felinia",
+        "passport_number": "P1234567"
+    },
+    "travel_details": {
+        "purpose": "Conference",
+        "arrival_date": "2026-12-01",
+        "departure_date": "2026-12-15"
+    }
+}
+
+
+def scenario_register(api, make_user, make_application, monkeypatch, server):
+    return lambda: api.post("/api/auth/register", json={
+        "email": "new.user@example.com", "password": "password123", "name": "New User"
+    })
+
+
+def scenario_login(api, make_user, make_application, monkeypatch, server):
+    make_user(email="login.user@example.com")
+    return lambda: api.post("/api/auth/login", json={
+        "email": "login.user@example.com", "password": "password123"
+    })
+
+
+def scenario_google_session(api, make_user, make_application, monkeypatch, server):
+    make_user(email="google.user@example.com")
+    payload = {
+        "email": "google.user@example.com",
+        "name": "Google User",
+        "picture": "https://example.com/avatar.png",
+        "session_token": "session_google_budget"
+    }
+    monkeypatch.setattr(server, "fetch_oauth_session", lambda session_id: payload)
+    return lambda: api.post("/api/auth/session", json={"session_id": "oauth-session"})
+
+
+def scenario_me(api, make_user, make_application, monkeypatch, server):
+    _, headers = make_user()
+    return lambda: api.get("/api/auth/me", headers=headers)
+
+
+def scenario_logout(api, make_user, make_application, monkeypatch, server):
+    _, headers = make_user()
+    return lambda: api.post("/api/auth/logout", headers=headers)
+
+
+def scenario_logout_everywhere(api, make_user, make_application, monkeypatch, server):
+    _, headers = make_user()
+    return lambda: api.post("/api/auth/logout-all", headers=headers)
+
+
+def scenario_create_application(api, make_user, make_application, monkeypatch, server):
+    _, headers = make_user()
+    return lambda: api.post("/api/applications", json=APPLICATION_PAYLOAD, headers=headers)
+
+
+def scenario_list_applications(api, make_user, make_application, monkeypatch, server):
+    user_id, headers = make_user()
+    make_application(user_id)
+    make_application(user_id)
+    return lambda: api.get("/api/applications", headers=headers)
+
+
+def scenario_get_application(api, make_user, make_application, monkeypatch, server):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    return lambda: api.get(f"/api/applications/{application['application_id']}", headers=headers)
+
+
+def scenario_get_document(api, make_user, make_application, monkeypatch, server):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    api.post(
+        f"/api/applications/{application['application_id']}/documents",
+        params={"doc_type": "photo"},
+        files={"file": ("photo.jpg", b"photo-bytes", "image/jpeg")},
+        headers=headers
+    )
+    server.application_cache.clear()
+    return lambda: api.get(f"/api/applications/{application['application_id']}/documents/photo", headers=headers)
+
+
+def scenario_update_application(api, make_user, make_application, monkeypatch, server):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    return lambda: api.put(
+        f"/api/applications/{application['application_id']}", json=APPLICATION_PAYLOAD, headers=headers
+    )
+
+
+def scenario_patch_application(api, make_user, make_application, monkeypatch, server):
+    user_id, headers = make_user()
+    application = make_application(user_id, version=1)
+    return lambda: api.patch(
+        f"/api/applications/{application['application_id']}",
+        json={"version": 1, "personal_info": {"full_name": "Renamed Applicant"}},
+        headers=headers
+    )
+
+
+def scenario_upload_document(api, make_user, make_application, monkeypatch, server):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    return lambda: api.post(
+        f"/api/applications/{application['application_id']}/documents",
+        params={"doc_type": "passport"},
+        files={"file": ("passport.jpg", b"passport-scan", "image/jpeg")},
+        headers=headers
+    )
+
+
+def scenario_submit_application(api, make_user, make_application, monkeypatch, server):
+    user_id, headers = make_user()
+    application = make_application(user_id)
+    return lambda: api.post(f"/api/applications/{application['application_id']}/submit", headers=headers)
+
+
+def scenario_admin_list(api, make_user, make_application, monkeypatch, server):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    make_application(user_id, status="submitted")
+    return lambda: api.get("/api/admin/applications", headers=admin_headers)
+
+
+def scenario_export(api, make_user, make_application, monkeypatch, server):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    make_application(user_id, status="submitted")
+    return lambda: api.get("/api/admin/applications/export", params={"format": "csv"}, headers=admin_headers)
+
+
+def scenario_update_status(api, make_user, make_application, monkeypatch, server):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    application = make_application(user_id, status="submitted")
+
+    async def no_email(*args, **kwargs):
+        return True
+
+    monkeypatch.setattr(server, "send_approval_email", no_email)
+    monkeypatch.setattr(server, "send_rejection_email", no_email)
+    # The admin email is flushed later, outside the request
+    monkeypatch.setattr(server, "ADMIN_NOTIFICATION_FLUSH_SECONDS", 60)
+    return lambda: api.put(
+        f"/api/admin/applications/{application['application_id']}/status",
+        json={"status": "approved"},
+        headers=admin_headers
+    )
+
+
+def scenario_update_role(api, make_user, make_application, monkeypatch, server):
+    user_id, _ = make_user()
+    _, admin_headers = make_user(role="admin")
+    return lambda: api.put(f"/api/admin/users/{user_id}/role", json={"role": "admin"}, headers=admin_headers)
+
+
+def scenario_health_live(api, make_user, make_application, monkeypatch, server):
+    return lambda: api.get("/api/health/live")
+
+
+def scenario_health_ready(api, make_user, make_application, monkeypatch, server):
+    return lambda: api.get("/api/health/ready")
+
+
+SCENARIOS = {
+    ("POST", "/api/auth/register"): scenario_register,
+    ("POST", "/api/auth/login"): scenario_login,
+    ("POST", "/api/auth/session"): scenario_google_session,
+    ("GET", "/api/auth/me"): scenario_me,
+    ("POST", "/api/auth/logout"): scenario_logout,
+    ("POST", "/api/auth/logout-all"): scenario_logout_everywhere,
+    ("POST", "/api/applications"): scenario_create_application,
+    ("GET", "/api/applications"): scenario_list_applications,
+    ("GET", "/api/applications/{application_id}"): scenario_get_application,
+    ("GET", "/api/applications/{application_id}/documents/{doc_type}"): scenario_get_document,
+    ("PUT", "/api/applications/{application_id}"): scenario_update_application,
+    ("PATCH", "/api/applications/{application_id}"): scenario_patch_application,
+    ("POST", "/api/applications/{application_id}/documents"): scenario_upload_document,
+    ("POST", "/api/applications/{application_id}/submit"): scenario_submit_application,
+    ("GET", "/api/admin/applications"): scenario_admin_list,
+    ("GET", "/api/admin/applications/export"): scenario_export,
+    ("PUT", "/api/admin/applications/{application_id}/status"): scenario_update_status,
+    ("PUT", "/api/admin/users/{user_id}/role"): scenario_update_role,
+    ("GET", "/api/health/live"): scenario_health_live,
+    ("GET", "/api/health/ready"): scenario_health_ready,
+}
+
+
+def test_every_route_declares_a_budget(server):
+    routes = {
+        (method, route.path)
+        for route in server.api_router.routes
+        for method in route.methods
+    }
+    assert routes - set(ROUND_TRIP_BUDGETS) == set(), "add a round-trip budget for new routes"
+    assert set(ROUND_TRIP_BUDGETS) - routes == set(), "remove budgets for deleted routes"
+    assert set(SCENARIOS) == set(ROUND_TRIP_BUDGETS)
+
+
+@pytest.mark.parametrize("route", sorted(ROUND_TRIP_BUDGETS), ids=lambda route: " ".join(route))
+def test_route_stays_within_round_trip_budget(route, api, server, make_user, make_application, round_trips, monkeypatch):
+    request = SCENARIOS[route](api, make_user, make_application, monkeypatch, server)
+
+    round_trips.reset()
+    response = request()
+
+    assert response.status_code < 400, response.text
+    assert round_trips.count <= ROUND_TRIP_BUDGETS[route], (
+        f"{route} made {round_trips.count} round trips: {round_trips.calls}"
+    )
@@ -0,0 +1,68 @@
+import pytest
+
+
+def test_login_burst_is_rejected_with_retry_after(server, api, make_user, monkeypatch, login):
+    monkeypatch.setitem(server.RATE_LIMITS, "login", (2, 2 / 60))
+    make_user(email="burst.user@example.com")
+
+    assert login("burst.user@example.com").status_code == 200
+    assert login("burst.user@example.com").status_code == 200
+    response = login("burst.user@example.com")
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "30"
+
+
+def test_upload_buckets_are_per_user(server, api, make_user, make_application, monkeypatch, upload):
+    monkeypatch.setitem(server.RATE_LIMITS, "upload", (1, 1 / 60))
+    first_id, first_headers = make_user()
+    second_id, second_headers = make_user()
+    first_app = make_application(first_id)
+    second_app = make_application(second_id)
+
+    assert upload(first_headers, first_app["application_id"]).status_code == 200
+    assert upload(first_headers, first_app["application_id"]).status_code == 429
+    assert upload(second_headers, second_app["application_id"]).status_code == 200
+
+
+def test_disabled_limit_admits_everything(server, api, make_user, monkeypatch, login):
+    monkeypatch.setitem(server.RATE_LIMITS, "login", server.parse_rate_limit("0"))
+    make_user(email="burst.user@example.com")
+
+    assert all(login("burst.user@example.com").status_code == 200 for _ in range(5))
+
+
+def test_tokens_refill_over_time(server):
+    bucket, retry_after = server.take_token(None, 2, 1.0, now=100.0)
+    bucket, retry_after = server.take_token(bucket, 2, 1.0, now=100.0)
+    assert retry_after == 0
+
+    _, retry_after = server.take_token(bucket, 2, 1.0, now=100.25)
+    assert retry_after == pytest.approx(0.75)
+
+    _, retry_after = server.take_token(bucket, 2, 1.0, now=101.0)
+    assert retry_after == 0
+
+
+def test_mongo_buckets_are_shared_between_workers(server, run, api):
+    first_worker = server.MongoTokenBucketLimiter()
+    second_worker = server.MongoTokenBucketLimiter()
+
+    assert run(first_worker.acquire, "login:10.0.0.1", 2, 2 / 60) == 0
+    assert run(second_worker.acquire, "login:10.0.0.1", 2, 2 / 60) == 0
+    assert run(first_worker.acquire, "login:10.0.0.1", 2, 2 / 60) > 0
+    assert run(second_worker.acquire, "login:10.0.0.2", 2, 2 / 60) == 0
+
+
+def test_untrusted_forwarded_for_is_ignored_with_one_warning(server, api, make_user, monkeypatch, caplog):
+    monkeypatch.setitem(server.RATE_LIMITS, "login", (1, 1 / 60))
+    monkeypatch.setattr(server, "forwarded_for_warning_logged", False)
+    make_user(email="proxied.user@example.com")
+    credentials = {"email": "proxied.user@example.com", "password": "password123"}
+
+    first = api.post("/api/auth/login", json=credentials, headers={"X-Forwarded-For": "203.0.113.1"})
+    second = api.post("/api/auth/login", json=credentials, headers={"X-Forwarded-For": "203.0.113.2"})
+
+    assert (first.status_code, second.status_code) == (200, 429)
+    warnings = [record for record in caplog.records if "TRUST_FORWARDED_FOR" in record.getMessage()]
+    assert len(warnings) == 1
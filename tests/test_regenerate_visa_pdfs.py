@@ -0,0 +1,96 @@
+import base64
+import io
+
+import pytest
+from PIL import Image
+
+
+def jpeg() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4), "white").save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+PHOTO = jpeg()
+
+
+@pytest.fixture
+def regenerate(server, run):
+    import regenerate_visa_pdfs
+
+    def runner(**options):
+        return run(regenerate_visa_pdfs.regenerate_visa_pdfs, workers=1, report=lambda line: None, **options)
+    runner.module = regenerate_visa_pdfs
+    return runner
+
+
+def stored_documents(server, run):
+    return run(lambda: server.db.visa_documents.find({}, {"_id": 0}).to_list(None))
+
+
+def test_renders_every_approved_application(server, run, api, make_user, make_application, regenerate):
+    user_id, _ = make_user()
+    approved = [make_application(user_id, status="approved") for _ in range(3)]
+    make_application(user_id, status="submitted")
+
+    summary = regenerate(batch_size=2)
+
+    assert summary["rendered"] == 3
+    documents = stored_documents(server, run)
+    assert sorted(doc["application_id"] for doc in documents) == sorted(app["application_id"] for app in approved)
+    assert all(doc["pdf"].startswith(b"%PDF") for doc in documents)
+    assert run(server.db.job_checkpoints.count_documents, {}) == 0
+
+
+def test_resumes_after_the_checkpoint(server, run, api, make_user, make_application, regenerate):
+    user_id, _ = make_user()
+    first, second = make_application(user_id, status="approved"), make_application(user_id, status="approved")
+    first_id = run(server.db.visa_applications.find_one, {"application_id": first["application_id"]})["_id"]
+    run(server.db.job_checkpoints.insert_one, {"_id": regenerate.module.CHECKPOINT_ID, "last_id": first_id, "processed": 1})
+
+    assert regenerate()["rendered"] == 1
+    assert [doc["application_id"] for doc in stored_documents(server, run)] == [second["application_id"]]
+
+
+def test_dry_run_stores_nothing(server, run, api, make_user, make_application, regenerate):
+    user_id, _ = make_user()
+    make_application(user_id, status="approved")
+
+    summary = regenerate(dry_run=True)
+
+    assert summary["rendered"] == 1
+    assert summary["average_kb"] > 0
+    assert stored_documents(server, run) == []
+    assert run(server.db.job_checkpoints.count_documents, {}) == 0
+
+
+def test_limited_run_keeps_the_checkpoint(server, run, api, make_user, make_application, regenerate):
+    user_id, _ = make_user()
+    for _ in range(3):
+        make_application(user_id, status="approved")
+
+    assert regenerate(limit=2)["rendered"] == 2
+    assert run(server.db.job_checkpoints.find_one, {})["processed"] == 2
+
+    assert regenerate()["rendered"] == 1
+    assert len(stored_documents(server, run)) == 3
+    assert run(server.db.job_checkpoints.count_documents, {}) == 0
+
+
+def test_renders_archived_applications(server, run, api, make_user, make_application, regenerate):
+    user_id, _ = make_user()
+    live = make_application(user_id, status="approved")
+    photo = {"filename": "photo.jpg", "content_type": "image/jpeg", "data": base64.b64encode(PHOTO).decode()}
+    archived = make_application(user_id, status="approved", decided_at="2020-01-01T00:00:00+00:00",
+                                documents={"photo": photo})
+    assert run(server.archive_decided_applications, 30, 10, 0) == 1
+
+    assert regenerate(batch_size=1, limit=1)["rendered"] == 1
+    assert run(server.db.job_checkpoints.find_one, {})["collection"] == "visa_applications"
+    assert regenerate(batch_size=1)["rendered"] == 1
+
+    sizes = {doc["application_id"]: doc["size"] for doc in stored_documents(server, run)}
+    assert sizes.keys() == {live["application_id"], archived["application_id"]}
+    # The archived photo was decompressed and embedded
+    assert sizes[archived["application_id"]] > sizes[live["application_id"]]
+    assert run(server.db.job_checkpoints.count_documents, {}) == 0
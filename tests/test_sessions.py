@@ -0,0 +1,79 @@
+from datetime import datetime, timezone, timedelta
+
+
+def bearer(response):
+    assert response.status_code == 200
+    return {"Authorization": f"Bearer {response.cookies['session_token']}"}
+
+
+def backdate_session(server, run, headers, **ages):
+    token = headers["Authorization"].split(" ")[1]
+    now = datetime.now(timezone.utc)
+    run(server.db.user_sessions.update_one, {"session_token": token}, {"$set": {
+        field: (now - age).isoformat() for field, age in ages.items()
+    }})
+    return token
+
+
+def test_recent_session_is_not_rewritten(server, api, make_user, round_trips):
+    _, headers = make_user()
+
+    for _ in range(3):
+        assert api.get("/api/auth/me", headers=headers).status_code == 200
+
+    assert not [call for call in round_trips.calls if call.startswith("user_sessions.update")]
+
+
+def test_stale_last_seen_slides_expiry_once(server, run, api, make_user, round_trips, login):
+    make_user(email="session.user@example.com")
+    headers = bearer(login("session.user@example.com"))
+    token = backdate_session(server, run, headers, last_seen=timedelta(hours=2))
+    round_trips.reset()
+
+    api.get("/api/auth/me", headers=headers)
+    api.get("/api/auth/me", headers=headers)
+
+    assert round_trips.calls.count("user_sessions.update_one") == 1
+    session = run(server.db.user_sessions.find_one, {"session_token": token})
+    expires_at = datetime.fromisoformat(session["expires_at"])
+    assert expires_at > datetime.now(timezone.utc) + timedelta(days=server.SESSION_TTL_DAYS, minutes=-1)
+
+
+def test_sliding_never_passes_max_lifetime(server, run, api, make_user, login):
+    make_user(email="session.user@example.com")
+    headers = bearer(login("session.user@example.com"))
+    token = backdate_session(
+        server, run, headers,
+        created_at=timedelta(days=server.SESSION_MAX_LIFETIME_DAYS - 1), last_seen=timedelta(days=1)
+    )
+
+    api.get("/api/auth/me", headers=headers)
+
+    session = run(server.db.user_sessions.find_one, {"session_token": token})
+    assert datetime.fromisoformat(session["expires_at"]) < datetime.now(timezone.utc) + timedelta(days=1, minutes=1)
+
+
+def test_login_beyond_cap_evicts_least_recent_session(server, run, api, make_user, monkeypatch, login):
+    monkeypatch.setattr(server, "MAX_SESSIONS_PER_USER", 2)
+    user_id, original_headers = make_user(email="session.user@example.com")
+
+    first = bearer(login("session.user@example.com"))
+    second = bearer(login("session.user@example.com"))
+
+    assert api.get("/api/auth/me", headers=original_headers).status_code == 401
+    assert api.get("/api/auth/me", headers=first).status_code == 200
+    assert api.get("/api/auth/me", headers=second).status_code == 200
+    assert run(server.db.user_sessions.count_documents, {"user_id": user_id}) == 2
+
+
+def test_logout_everywhere_ends_every_session(server, run, api, make_user, login):
+    user_id, headers = make_user(email="session.user@example.com")
+    other_device = bearer(login("session.user@example.com"))
+    _, bystander = make_user()
+
+    response = api.post("/api/auth/logout-all", headers=headers)
+
+    assert response.status_code == 200
+    assert response.json()["sessions_ended"] == 2
+    assert api.get("/api/auth/me", headers=other_device).status_code == 401
+    assert api.get("/api/auth/me", headers=bystander).status_code == 200
@@ -0,0 +1,29 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+
+HEAVY_MODULES = ["bcrypt", "requests", "resend", "reportlab", "emergentintegrations"]
+
+IMPORT_PROBE = f"""
+import json, sys
+import server
+print(json.dumps({{
+    "loaded": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+    "client": server.client is not None,
+}}))
+"""
+
+
+def test_importing_server_skips_optional_subsystems_and_mongo():
+    env = {key: value for key, value in os.environ.items() if key != "MONGO_URL"}
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.splitlines()[-1]) == {"loaded": [], "client": False}